@@ -1,18 +1,139 @@
+import atexit
+import threading
+from urllib.parse import urlencode
+
+import orjson
 from django.conf import settings
-from httpx import Client
+from httpx import URL, AsyncClient, Client, Limits, QueryParams
+
+# Sent without a body: `owner_id` goes in the query string instead
+BODILESS_METHODS = frozenset({"GET", "HEAD"})
+
+
+def dumps_json(payload) -> bytes:
+    """Compact JSON, encoded by orjson."""
+    return orjson.dumps(payload)
+
+
+def client_options() -> dict:
+    """Connection pool and protocol settings of the API clients."""
+    return {
+        "limits": Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "http2": settings.HTTP2,
+    }
+
+
+def _with_owner_id(method: str, url, kwargs: dict) -> tuple:
+    """
+    Add `owner_id` to the query string of GET and HEAD requests, and to
+    the JSON body of others, serialized once by `dumps_json`. A body
+    passed as `content`, `data` or `files` is left alone.
+    """
+    if method.upper() in BODILESS_METHODS:
+        if kwargs.get("params") is not None:
+            # httpx replaces the query of `url` with `params`
+            kwargs["params"] = _add_owner_id_param(QueryParams(kwargs["params"]))
+        else:
+            url = _add_owner_id_param(url)
+        return url, kwargs
+
+    # httpx passes `json=None` along with the other bodies
+    if kwargs.get("json") is None and any(
+        kwargs.get(name) is not None for name in ("content", "data", "files")
+    ):
+        return url, kwargs
+
+    payload = kwargs.pop("json", None) or {}
+    if "owner_id" not in payload:
+        payload = {**payload, "owner_id": settings.OWNER_ID}
+    kwargs["content"] = dumps_json(payload)
+    headers = kwargs.get("headers")
+    kwargs["headers"] = {"Content-Type": "application/json", **(headers or {})}
+    return url, kwargs
+
+
+def _add_owner_id_param(target):
+    """Add `owner_id` to a str or `URL` url, or to `QueryParams`."""
+    if isinstance(target, str):
+        if "?owner_id=" in target or "&owner_id=" in target:
+            return target
+        separator = "&" if "?" in target else "?"
+        return f"{target}{separator}{urlencode({'owner_id': settings.OWNER_ID})}"
+    if isinstance(target, URL):
+        if "owner_id" in target.params:
+            return target
+        return target.copy_merge_params({"owner_id": settings.OWNER_ID})
+    if "owner_id" in target:
+        return target
+    return target.set("owner_id", settings.OWNER_ID)
 
 
 class EventApiClient(Client):
+    """
+    Client of the provider and notifications APIs.
+
+    Pool limits and HTTP/2 come from `client_options`; httpx negotiates
+    gzip itself. Prefer the shared `get_api_client` to a new client, so
+    connections are kept alive across runs.
+    """
+
     def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+        super().__init__(*args, **{**client_options(), **kwargs})
 
         self.headers.update({
             "Authorization": f"Bearer {settings.API_JWT}",
         })
-    
-    def request(self, method, url, *args, **kwargs):
-        json_payload = dict(kwargs.pop("json", {}) or {})
-        json_payload.setdefault("owner_id", settings.OWNER_ID)
-        kwargs["json"] = json_payload
 
-        return super().request(method, url, *args, **kwargs)
+    # Covers both `request` and `stream`
+    def build_request(self, method, url, *args, **kwargs):
+        url, kwargs = _with_owner_id(method, url, kwargs)
+        return super().build_request(method, url, *args, **kwargs)
+
+
+class AsyncEventApiClient(AsyncClient):
+    """
+    Async `EventApiClient`. Bound to the event loop it runs on, so it is
+    created per run rather than shared.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **{**client_options(), **kwargs})
+
+        self.headers.update({
+            "Authorization": f"Bearer {settings.API_JWT}",
+        })
+
+    def build_request(self, method, url, *args, **kwargs):
+        url, kwargs = _with_owner_id(method, url, kwargs)
+        return super().build_request(method, url, *args, **kwargs)
+
+
+_shared_client: EventApiClient | None = None
+_shared_client_lock = threading.Lock()
+
+
+def get_api_client() -> EventApiClient:
+    """
+    The process's shared `EventApiClient`, created on first use and closed
+    at exit. It is thread-safe; callers must not close it.
+    """
+    global _shared_client
+
+    with _shared_client_lock:
+        if _shared_client is None or _shared_client.is_closed:
+            _shared_client = EventApiClient()
+        return _shared_client
+
+
+@atexit.register
+def close_api_client() -> None:
+    global _shared_client
+
+    with _shared_client_lock:
+        if _shared_client is not None:
+            _shared_client.close()
+            _shared_client = None
@@ -10,7 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
-from datetime import timedelta
+from datetime import date, timedelta
 from pathlib import Path
 
 import environ
@@ -205,6 +205,70 @@ OWNER_ID = env("OWNER_ID")
 API_JWT = env("API_JWT")
 EVENT_PROVIDER_API_URL = env("EVENT_PROVIDER_API_URL")
 NOTIFICATIONS_API_URL = env("NOTIFICATIONS_API_URL")
-
-
-
+# Batch endpoint of the notifications API, empty if it has none
+NOTIFICATIONS_API_BATCH_URL = env("NOTIFICATIONS_API_BATCH_URL", default="")
+# Connection pool of the API clients, and HTTP/2 if the h2 package is installed
+HTTP_MAX_CONNECTIONS = env.int("HTTP_MAX_CONNECTIONS", default=100)
+HTTP_MAX_KEEPALIVE_CONNECTIONS = env.int("HTTP_MAX_KEEPALIVE_CONNECTIONS", default=32)
+HTTP_KEEPALIVE_EXPIRY = env.float("HTTP_KEEPALIVE_EXPIRY", default=30)
+HTTP2 = env.bool("HTTP2", default=True)
+# Query parameter bounding a `changed_at` range from above
+EVENT_PROVIDER_CHANGED_BEFORE_PARAM = env(
+    "EVENT_PROVIDER_CHANGED_BEFORE_PARAM", default="changed_before"
+)
+
+
+# SYNC
+
+# Event batches fetched ahead of the database writer (0 disables prefetch)
+SYNC_PREFETCH_BATCHES = env.int("SYNC_PREFETCH_BATCHES", default=2)
+# Events decoded from a streamed page before they are written
+SYNC_BATCH_SIZE = env.int("SYNC_BATCH_SIZE", default=500)
+# Commit a whole batch of the per-event writer at once, instead of every event
+SYNC_ATOMIC_BATCHES = env.bool("SYNC_ATOMIC_BATCHES", default=True)
+# Venues kept in memory by a sync process
+SYNC_VENUE_CACHE_SIZE = env.int("SYNC_VENUE_CACHE_SIZE", default=10_000)
+# Concurrent sync: parallel provider requests and `changed_at` window size
+SYNC_CONCURRENCY = env.int("SYNC_CONCURRENCY", default=8)
+SYNC_WINDOW_DAYS = env.int("SYNC_WINDOW_DAYS", default=7)
+# Sharded sync: how often a run waits on shards held by other hosts
+SYNC_SHARD_POLL_SECONDS = env.int("SYNC_SHARD_POLL_SECONDS", default=5)
+# Sync daemon: polling interval bounds, in seconds
+SYNC_DAEMON_MIN_INTERVAL = env.float("SYNC_DAEMON_MIN_INTERVAL", default=5)
+SYNC_DAEMON_MAX_INTERVAL = env.float("SYNC_DAEMON_MAX_INTERVAL", default=60)
+# Windowed full syncs: where `changed_at` windows start. The first window
+# has no lower bound, so it also takes events changed before this date
+SYNC_HISTORY_START = date.fromisoformat(
+    env("SYNC_HISTORY_START", default="2020-01-01")
+)
+
+
+# OUTBOX
+
+# Notifications sent in parallel by an outbox worker
+OUTBOX_CONCURRENCY = env.int("OUTBOX_CONCURRENCY", default=16)
+# Notifications per request to NOTIFICATIONS_API_BATCH_URL
+OUTBOX_SEND_BATCH_SIZE = env.int("OUTBOX_SEND_BATCH_SIZE", default=50)
+# Requests per second to the notifications API by one runoutbox command, split
+# between its processes (0 for no limit), and the burst allowed to a process.
+# Commands don't share it: with several, each must get its part of the API's
+OUTBOX_COMMAND_RATE_LIMIT = env.float("OUTBOX_COMMAND_RATE_LIMIT", default=0)
+OUTBOX_RATE_BURST = env.int("OUTBOX_RATE_BURST", default=20)
+# Circuit breaker: failed requests in a row that pause sending (0 disables it),
+# and for how long before probing the API again
+OUTBOX_BREAKER_THRESHOLD = env.int("OUTBOX_BREAKER_THRESHOLD", default=10)
+OUTBOX_BREAKER_RESET_SECONDS = env.float("OUTBOX_BREAKER_RESET_SECONDS", default=30)
+# Longest an idle worker waits for a notification before looking at the table
+OUTBOX_POLL_SECONDS = env.float("OUTBOX_POLL_SECONDS", default=60)
+# Minimum time a worker holds claimed messages; raised to cover slow claims
+OUTBOX_LEASE_SECONDS = env.int("OUTBOX_LEASE_SECONDS", default=120)
+# How often a worker records its heartbeat and counters
+OUTBOX_HEARTBEAT_SECONDS = env.float("OUTBOX_HEARTBEAT_SECONDS", default=15)
+# Failed sends: attempts before dead-lettering and retry backoff, in seconds
+OUTBOX_MAX_ATTEMPTS = env.int("OUTBOX_MAX_ATTEMPTS", default=10)
+OUTBOX_BACKOFF_SECONDS = env.int("OUTBOX_BACKOFF_SECONDS", default=10)
+OUTBOX_MAX_BACKOFF_SECONDS = env.int("OUTBOX_MAX_BACKOFF_SECONDS", default=3600)
+# Archival: sent messages are kept this long, then moved in chunks; rows of
+# workers stopped this long ago are pruned
+OUTBOX_RETENTION_DAYS = env.int("OUTBOX_RETENTION_DAYS", default=30)
+OUTBOX_ARCHIVE_CHUNK_SIZE = env.int("OUTBOX_ARCHIVE_CHUNK_SIZE", default=5000)
@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+import httpx
+from django.test import SimpleTestCase, override_settings
+
+from core.http_clients import AsyncEventApiClient, EventApiClient
+
+
+@override_settings(OWNER_ID="owner-1", API_JWT="token")
+class OwnerIdTests(SimpleTestCase):
+    """`owner_id` reaches the provider on the wire, whatever the method."""
+
+    def setUp(self):
+        self.requests = []
+        self.client = EventApiClient(transport=httpx.MockTransport(self.respond))
+        self.addCleanup(self.client.close)
+
+    def respond(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return httpx.Response(200, json={})
+
+    def sent(self) -> httpx.Request:
+        self.assertEqual(len(self.requests), 1)
+        return self.requests.pop()
+
+    def test_get_query(self):
+        self.client.get("http://provider.test/events/?cursor=abc")
+        request = self.sent()
+        self.assertEqual(
+            dict(request.url.params), {"cursor": "abc", "owner_id": "owner-1"}
+        )
+        self.assertEqual(request.content, b"")
+        self.assertEqual(request.headers["Authorization"], "Bearer token")
+
+    def test_get_params(self):
+        self.client.get("http://provider.test/events/", params={"page": 2})
+        self.assertEqual(
+            dict(self.sent().url.params), {"page": "2", "owner_id": "owner-1"}
+        )
+
+    def test_get_keeps_given_owner_id(self):
+        self.client.get(httpx.URL("http://provider.test/events/?owner_id=other"))
+        self.assertEqual(self.sent().url.params.get_list("owner_id"), ["other"])
+
+    def test_stream_query(self):
+        with self.client.stream("GET", "http://provider.test/events/"):
+            pass
+        self.assertEqual(self.sent().url.params["owner_id"], "owner-1")
+
+    def test_post_json_body(self):
+        self.client.post("http://n.test/send/", json={"email": "ivan@example.com"})
+        request = self.sent()
+        self.assertEqual(
+            json.loads(request.content),
+            {"email": "ivan@example.com", "owner_id": "owner-1"},
+        )
+        self.assertEqual(request.headers["Content-Type"], "application/json")
+        self.assertNotIn("owner_id", request.url.params)
+
+    def test_post_raw_body_untouched(self):
+        self.client.post("http://n.test/send/", content=b"raw")
+        self.assertEqual(self.sent().content, b"raw")
+
+    def test_async_client(self):
+        async def run():
+            transport = httpx.MockTransport(self.respond)
+            async with AsyncEventApiClient(transport=transport) as client:
+                await client.get("http://provider.test/events/")
+                await client.post("http://n.test/send/", json={})
+
+        asyncio.run(run())
+        get, post = self.requests
+        self.assertEqual(get.url.params["owner_id"], "owner-1")
+        self.assertEqual(json.loads(post.content), {"owner_id": "owner-1"})
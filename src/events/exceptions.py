@@ -2,6 +2,13 @@ class EventRegistrationError(Exception):
     """Base exception for registration errors."""
 
 
+class EventNotFoundError(EventRegistrationError):
+    """Raised when registering for an event that doesn't exist."""
+
+    def __init__(self, message="Event not found."):
+        super().__init__(message)
+
+
 class EventClosedError(EventRegistrationError):
     """Raised when trying to register for a closed event."""
 
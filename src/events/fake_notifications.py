@@ -0,0 +1,100 @@
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+
+class FakeNotifications:
+    """
+    Stand-in for the notifications API, served in process through
+    `httpx.MockTransport` or over HTTP by `serve`.
+
+    Any path takes a single notification; paths ending in `batch/` take
+    `{"notifications": [...]}` and answer a status per notification, as
+    `events.worker.BatchDelivery` expects, unless `batch` is False, in
+    which case they answer 404. Each request waits `latency` seconds and
+    each notification fails with a 503 with probability `failure_rate`.
+    """
+
+    def __init__(
+            self,
+            latency: float = 0.0,
+            failure_rate: float = 0.0,
+            batch: bool = True,
+            seed: int = 0,
+            base_url: str = "http://notifications.test/",
+        ):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.batch = batch
+        self.base_url = base_url
+        self.requests_count = 0
+        # Notification id -> times delivered
+        self.delivered = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"{self.base_url}send/"
+
+    @property
+    def batch_url(self) -> str:
+        return f"{self.base_url}send/batch/"
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            self.requests_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        body = json.loads(request.content)
+        if not request.url.path.endswith("batch/"):
+            status = self._deliver(body)
+            return httpx.Response(status, json={"id": body["id"]})
+        if not self.batch:
+            return httpx.Response(404)
+
+        results = [
+            {"id": notification["id"], "status": self._deliver(notification)}
+            for notification in body["notifications"]
+        ]
+        return httpx.Response(200, json={"results": results})
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8025) -> ThreadingHTTPServer:
+        """An HTTP server for `handle`; the caller runs `serve_forever`."""
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                request = httpx.Request(
+                    "POST",
+                    f"http://{host}:{port}{self.path}",
+                    headers=dict(self.headers),
+                    content=self.rfile.read(int(self.headers["Content-Length"])),
+                )
+                response = fake.handle(request)
+                self.send_response(response.status_code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(response.content)))
+                self.end_headers()
+                self.wfile.write(response.content)
+
+            def log_message(self, format, *args):
+                pass
+
+        return ThreadingHTTPServer((host, port), Handler)
+
+    def _deliver(self, notification: dict) -> int:
+        with self._lock:
+            if self._random.random() < self.failure_rate:
+                return 503
+            self.delivered[notification["id"]] += 1
+        return 200
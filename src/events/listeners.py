@@ -0,0 +1,94 @@
+import logging
+import select
+import socket
+from typing import Self
+
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+# Postgres channel notified when an outbox message is committed, see
+# `register_event`
+OUTBOX_CHANNEL = "outbox_message"
+
+
+class OutboxListener:
+    """
+    LISTENs for outbox notifications on a dedicated connection.
+
+    The connection is separate from Django's, so the worker's queries and
+    transactions never hold up notifications, and it stays in autocommit
+    as LISTEN requires. `wake` interrupts a `wait`, also from a signal
+    handler.
+    """
+
+    def __init__(self, channel: str = OUTBOX_CHANNEL):
+        self.channel = channel
+        self.connection = None
+        self._wake_reader, self._wake_writer = socket.socketpair()
+        self._wake_reader.setblocking(False)
+        self._wake_writer.setblocking(False)
+
+    def __enter__(self) -> Self:
+        self.connect()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+        self._wake_reader.close()
+        self._wake_writer.close()
+
+    def connect(self) -> None:
+        self.connection = connection.get_new_connection(
+            connection.get_connection_params()
+        )
+        self.connection.autocommit = True
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel}")
+
+    def close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def wake(self) -> None:
+        """Make the current or next `wait` return right away."""
+        try:
+            self._wake_writer.send(b"\0")
+        except BlockingIOError:
+            # Already woken up
+            pass
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Block until a notification arrives or `timeout` seconds pass,
+        returning whether one arrived. Notifications received meanwhile are
+        coalesced: one wake-up is enough to claim them all.
+        """
+        try:
+            if not self.connection.notifies:
+                readable, _, _ = select.select(
+                    [self.connection, self._wake_reader], [], [], timeout
+                )
+                if self._wake_reader in readable:
+                    self._drain_wake()
+                if self.connection not in readable:
+                    return False
+                self.connection.poll()
+        except (connection.Database.Error, OSError) as e:
+            logger.warning(f"Outbox listener connection lost, reconnecting: {e}")
+            self.close()
+            self.connect()
+            # Whatever was notified meanwhile is lost, look at the table
+            return True
+
+        notified = bool(self.connection.notifies)
+        self.connection.notifies.clear()
+        return notified
+
+    def _drain_wake(self) -> None:
+        try:
+            while self._wake_reader.recv(1024):
+                pass
+        except BlockingIOError:
+            pass
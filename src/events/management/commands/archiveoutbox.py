@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from events.metrics import prune_outbox_workers
+from events.worker import archive_outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Move sent outbox messages past retention to the archive table and "
+        "prune the rows of workers stopped since before then"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days",
+                            type=int,
+                            default=settings.OUTBOX_RETENTION_DAYS,
+                            help="Keep messages sent, and workers seen, in the last N days")
+        parser.add_argument("--chunk-size",
+                            type=int,
+                            default=settings.OUTBOX_ARCHIVE_CHUNK_SIZE,
+                            help="Messages moved per transaction")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        archived = archive_outbox(cutoff, chunk_size=options["chunk_size"])
+        pruned = prune_outbox_workers(cutoff)
+        self.stdout.write(f"Archive done: {archived} archived, {pruned} workers pruned")
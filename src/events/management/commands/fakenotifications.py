@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from events.fake_notifications import FakeNotifications
+
+
+class Command(BaseCommand):
+    help = "Serve a fake notifications API, for local runs and benchmarks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8025)
+        parser.add_argument("--latency-ms",
+                            type=float,
+                            default=0,
+                            help="Delay of every response")
+        parser.add_argument("--failure-rate",
+                            type=float,
+                            default=0,
+                            help="Share of notifications answered with a 503")
+        parser.add_argument("--no-batch",
+                            action="store_true",
+                            help="Answer 404 on the batch endpoint")
+
+    def handle(self, *args, **options):
+        fake = FakeNotifications(
+            latency=options["latency_ms"] / 1000,
+            failure_rate=options["failure_rate"],
+            batch=not options["no_batch"],
+        )
+        server = fake.serve(options["host"], options["port"])
+        base_url = f"http://{options['host']}:{options['port']}/"
+        self.stdout.write(
+            f"Fake notifications API on {base_url}send/, "
+            f"batches on {base_url}send/batch/"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        self.stdout.write(
+            f"{fake.requests_count} requests, "
+            f"{sum(fake.delivered.values())} notifications delivered"
+        )
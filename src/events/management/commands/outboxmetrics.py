@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from events.metrics import collect_outbox_metrics
+
+
+class Command(BaseCommand):
+    help = "Print outbox lag and throughput in the Prometheus text format"
+
+    def handle(self, *args, **options):
+        self.stdout.write(collect_outbox_metrics(), ending="")
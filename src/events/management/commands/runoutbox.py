@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from events.worker import process_outbox, start_outbox_workers
+
+
+class Command(BaseCommand):
+    help = "Send outbox messages to the notifications API until SIGTERM"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes",
+                            type=int,
+                            default=1,
+                            help="Worker processes sharing the outbox")
+        parser.add_argument("--batch-size",
+                            type=int,
+                            default=100,
+                            help="Messages claimed at a time by a worker")
+        parser.add_argument("--concurrency",
+                            type=int,
+                            default=settings.OUTBOX_CONCURRENCY,
+                            help="Notifications sent in parallel by a worker")
+        parser.add_argument("--send-batch-size",
+                            type=int,
+                            default=settings.OUTBOX_SEND_BATCH_SIZE,
+                            help="Notifications per request to the batch endpoint")
+        parser.add_argument("--rate-limit",
+                            type=float,
+                            default=settings.OUTBOX_COMMAND_RATE_LIMIT,
+                            help="Notifications API requests per second by this "
+                                 "command, split between its processes, 0 for no limit")
+
+    def handle(self, *args, **options):
+        for name in ("processes", "batch_size", "concurrency", "send_batch_size"):
+            if options[name] < 1:
+                raise CommandError(f"--{name.replace('_', '-')} must be positive")
+        if options["rate_limit"] < 0:
+            raise CommandError("--rate-limit can't be negative")
+
+        self.stdout.write("Outbox workers running, stop them with SIGTERM")
+        if options["processes"] == 1:
+            process_outbox(
+                batch_size=options["batch_size"],
+                concurrency=options["concurrency"],
+                send_batch_size=options["send_batch_size"],
+                rate_limit=options["rate_limit"],
+            )
+        else:
+            start_outbox_workers(
+                options["processes"],
+                batch_size=options["batch_size"],
+                concurrency=options["concurrency"],
+                send_batch_size=options["send_batch_size"],
+                rate_limit=options["rate_limit"],
+            )
+        self.stdout.write(self.style.SUCCESS("Outbox workers stopped"))
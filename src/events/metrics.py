@@ -0,0 +1,215 @@
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, Q, Sum
+from django.utils import timezone
+
+from .models import OutboxMessage, OutboxWorker
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds, in seconds, of the notifications API latency histogram
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Window of the send rate, in seconds
+SEND_RATE_WINDOW = 60
+
+# `OutboxWorker` row holding the counters of pruned workers
+RETIRED_WORKERS = "retired"
+
+
+@dataclass(slots=True)
+class OutboxStats:
+    """
+    Running totals of an outbox worker, stored on its `OutboxWorker` row.
+
+    Field names match the model fields. Sending threads update the totals
+    concurrently, so every update holds the lock. `latency_buckets` counts
+    requests per `LATENCY_BUCKETS` bound, slower ones only in
+    `latency_count`.
+    """
+
+    sent_count: int = 0
+    failed_count: int = 0
+    retries_count: int = 0
+    deferred_count: int = 0
+    latency_buckets: list[int] = field(
+        default_factory=lambda: [0] * len(LATENCY_BUCKETS)
+    )
+    latency_sum: float = 0.0
+    latency_count: int = 0
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def as_fields(self) -> dict:
+        with self._lock:
+            return {
+                "sent_count": self.sent_count,
+                "failed_count": self.failed_count,
+                "retries_count": self.retries_count,
+                "deferred_count": self.deferred_count,
+                "latency_buckets": list(self.latency_buckets),
+                "latency_sum": self.latency_sum,
+                "latency_count": self.latency_count,
+            }
+
+    def count_results(self, results) -> None:
+        """Count `DispatchResult`s: failures that may pass later are retried."""
+        with self._lock:
+            for result in results:
+                if result.sent:
+                    self.sent_count += 1
+                elif result.defer_seconds:
+                    self.deferred_count += 1
+                else:
+                    self.failed_count += 1
+                    self.retries_count += result.retryable
+
+    def observe_latency(self, seconds: float) -> None:
+        bucket = bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            if bucket < len(LATENCY_BUCKETS):
+                self.latency_buckets[bucket] += 1
+            self.latency_sum += seconds
+            self.latency_count += 1
+
+
+
+def collect_outbox_metrics() -> str:
+    """
+    Outbox metrics in the Prometheus text format.
+
+    Message gauges are read through the partial indexes of pending,
+    dead-lettered and recently sent messages, so they cost as much as
+    those (normally small) sets. Counters are summed over the worker rows,
+    the `RETIRED_WORKERS` row included, so they never go down.
+    """
+    now = timezone.now()
+    pending = (
+        OutboxMessage.objects
+        .filter(sent=False, dead_letter=False)
+        .aggregate(count=Count("pk"), oldest=Min("created_at"))
+    )
+    dead_letter = OutboxMessage.objects.filter(dead_letter=True).count()
+    recently_sent = OutboxMessage.objects.filter(
+        sent=True, sent_at__gte=now - timedelta(seconds=SEND_RATE_WINDOW)
+    ).count()
+
+    alive_since = now - timedelta(seconds=3 * settings.OUTBOX_HEARTBEAT_SECONDS)
+    workers = OutboxWorker.objects.aggregate(
+        alive=Count(
+            "pk", filter=Q(stopped_at__isnull=True, heartbeat_at__gte=alive_since)
+        ),
+        sent=Sum("sent_count", default=0),
+        failed=Sum("failed_count", default=0),
+        retries=Sum("retries_count", default=0),
+        deferred=Sum("deferred_count", default=0),
+        latency_sum=Sum("latency_sum", default=0.0),
+        latency_count=Sum("latency_count", default=0),
+    )
+    buckets = [0] * len(LATENCY_BUCKETS)
+    for worker_buckets in OutboxWorker.objects.values_list(
+        "latency_buckets", flat=True
+    ):
+        # Rows written with other bounds are skipped
+        if len(worker_buckets) == len(buckets):
+            buckets = [a + b for a, b in zip(buckets, worker_buckets, strict=True)]
+
+    oldest_age = (now - pending["oldest"]).total_seconds() if pending["oldest"] else 0
+    lines = []
+    _add_metric(lines, "outbox_oldest_unsent_age_seconds", "gauge",
+                "Age of the oldest message waiting to be sent", oldest_age)
+    _add_metric(lines, "outbox_unsent_messages", "gauge",
+                "Messages waiting to be sent, retries included", pending["count"])
+    _add_metric(lines, "outbox_dead_letter_messages", "gauge",
+                "Messages given up on", dead_letter)
+    _add_metric(lines, "outbox_send_rate", "gauge",
+                f"Messages sent per second over the last {SEND_RATE_WINDOW}s",
+                recently_sent / SEND_RATE_WINDOW)
+    _add_metric(lines, "outbox_workers_alive", "gauge",
+                "Workers with a recent heartbeat", workers["alive"])
+    _add_metric(lines, "outbox_sent_total", "counter",
+                "Messages sent by the workers", workers["sent"])
+    _add_metric(lines, "outbox_failed_total", "counter",
+                "Failed sends, retried or dead-lettered", workers["failed"])
+    _add_metric(lines, "outbox_retries_total", "counter",
+                "Failed sends scheduled to be retried", workers["retries"])
+    _add_metric(lines, "outbox_deferred_total", "counter",
+                "Sends deferred by the rate limiter or circuit breaker",
+                workers["deferred"])
+
+    name = "outbox_notification_latency_seconds"
+    lines.append(f"# HELP {name} Notifications API request latency")
+    lines.append(f"# TYPE {name} histogram")
+    cumulative = 0
+    for bound, count in zip(LATENCY_BUCKETS, buckets, strict=True):
+        cumulative += count
+        lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{le="+Inf"}} {workers["latency_count"]}')
+    lines.append(f"{name}_sum {workers['latency_sum']}")
+    lines.append(f"{name}_count {workers['latency_count']}")
+
+    return "\n".join(lines) + "\n"
+
+
+def prune_outbox_workers(before: datetime) -> int:
+    """
+    Delete the rows of workers stopped, or last seen, before `before`,
+    returning how many were deleted. Their counters are added to the
+    `RETIRED_WORKERS` row first, in the same transaction.
+    """
+    with transaction.atomic():
+        retired, _ = OutboxWorker.objects.select_for_update().get_or_create(
+            name=RETIRED_WORKERS,
+            defaults={
+                "started_at": before,
+                "heartbeat_at": before,
+                "stopped_at": before,
+                **OutboxStats().as_fields(),
+            },
+        )
+        pruned = list(
+            OutboxWorker.objects
+            .select_for_update()
+            .exclude(pk=retired.pk)
+            .filter(
+                Q(stopped_at__lt=before)
+                | Q(stopped_at__isnull=True, heartbeat_at__lt=before)
+            )
+        )
+        if not pruned:
+            return 0
+
+        totals = retired.latency_buckets
+        if len(totals) != len(LATENCY_BUCKETS):
+            totals = [0] * len(LATENCY_BUCKETS)
+        for worker in pruned:
+            for name in (
+                "sent_count", "failed_count", "retries_count", "deferred_count",
+                "latency_sum", "latency_count",
+            ):
+                setattr(retired, name, getattr(retired, name) + getattr(worker, name))
+            # Rows written with other bounds are skipped, as in the metrics
+            if len(worker.latency_buckets) == len(totals):
+                totals = [
+                    a + b for a, b in zip(totals, worker.latency_buckets, strict=True)
+                ]
+        retired.latency_buckets = totals
+        retired.heartbeat_at = retired.stopped_at = timezone.now()
+        retired.save()
+        OutboxWorker.objects.filter(pk__in=[worker.pk for worker in pruned]).delete()
+
+    return len(pruned)
+
+
+def _add_metric(
+        lines: list[str], name: str, kind: str, help_text: str, value: float
+    ) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    lines.append(f"{name} {value}")
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0007_alter_event_options_rename_date_event_event_time_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="payload_hash",
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+        migrations.AddField(
+            model_name="venue",
+            name="payload_hash",
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:44
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0009_outboxmessage_lease_expires_at_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outboxmessage",
+            name="attempts",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="outboxmessage",
+            name="dead_letter",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="outboxmessage",
+            name="last_error",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="outboxmessage",
+            name="next_attempt_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0010_outboxmessage_attempts_outboxmessage_dead_letter_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxMessageArchive",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(editable=False, primary_key=True, serialize=False),
+                ),
+                ("topic", models.CharField(max_length=255)),
+                ("payload", models.JSONField()),
+                ("sent_at", models.DateTimeField(null=True)),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="outboxmessage",
+            index=models.Index(
+                condition=models.Q(("dead_letter", False), ("sent", False)),
+                fields=["created_at"],
+                name="outbox_pending_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="outboxmessage",
+            index=models.Index(
+                condition=models.Q(("sent", True)),
+                fields=["sent_at"],
+                name="outbox_sent_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0012_outboxworker"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outboxworker",
+            name="latency_buckets",
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name="outboxworker",
+            name="latency_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="outboxworker",
+            name="latency_sum",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="outboxworker",
+            name="retries_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="outboxmessage",
+            index=models.Index(
+                condition=models.Q(("dead_letter", True)),
+                fields=["created_at"],
+                name="outbox_dead_letter_idx",
+            ),
+        ),
+    ]
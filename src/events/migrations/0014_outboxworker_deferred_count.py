@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0013_outbox_metrics"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outboxworker",
+            name="deferred_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
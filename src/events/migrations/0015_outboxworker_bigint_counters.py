@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0014_outboxworker_deferred_count"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="outboxworker",
+            name="deferred_count",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="outboxworker",
+            name="failed_count",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="outboxworker",
+            name="latency_count",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="outboxworker",
+            name="retries_count",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="outboxworker",
+            name="sent_count",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
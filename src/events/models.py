@@ -1,6 +1,7 @@
 from uuid import uuid4
 
 from django.db import models
+from django.utils import timezone
 
 
 class Venue(models.Model):
@@ -12,6 +13,8 @@ class Venue(models.Model):
     provider_id = models.UUIDField(unique=True, null=True, blank=True)
     
     name = models.CharField("Название", max_length=255, unique=True)
+    # Digest of the provider payload, see sync.decoding.hash_payload
+    payload_hash = models.CharField(max_length=32, blank=True, editable=False)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -50,6 +53,8 @@ class Event(models.Model):
         on_delete=models.CASCADE,
         verbose_name="Площадка"
     )
+    # Digest of the provider payload, see sync.decoding.hash_payload
+    payload_hash = models.CharField(max_length=32, blank=True, editable=False)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -95,8 +100,81 @@ class OutboxMessage(models.Model):
     sent = models.BooleanField(default=False)
     sent_at = models.DateTimeField(null=True)
 
+    # host:pid of the worker sending the message, until `lease_expires_at`
+    lease_owner = models.CharField(max_length=255, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+
+    # Failed sends so far; the message is retried from `next_attempt_at`
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    # Given up on: out of attempts or rejected by the notifications API
+    dead_letter = models.BooleanField(default=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Worker claim: oldest pending messages
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(sent=False, dead_letter=False),
+                name="outbox_pending_idx",
+            ),
+            # Metrics: dead-letter count
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(dead_letter=True),
+                name="outbox_dead_letter_idx",
+            ),
+            # Archival and send rate: sent messages by time
+            models.Index(
+                fields=["sent_at"],
+                condition=models.Q(sent=True),
+                name="outbox_sent_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.topic} - sent: {self.sent}"
 
+
+class OutboxMessageArchive(models.Model):
+    """Sent outbox messages moved out of the worker's table, see `archive_outbox`."""
+
+    id = models.UUIDField(primary_key=True, editable=False)
+
+    topic = models.CharField(max_length=255)
+    payload = models.JSONField()
+
+    sent_at = models.DateTimeField(null=True)
+    attempts = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.topic} - sent at: {self.sent_at}"
+
+
+class OutboxWorker(models.Model):
+    """A `runoutbox` worker process, kept up to date by its heartbeat."""
+
+    # host:pid:start id, as in `OutboxMessage.lease_owner`
+    name = models.CharField(max_length=255, unique=True)
+    started_at = models.DateTimeField()
+    heartbeat_at = models.DateTimeField()
+    stopped_at = models.DateTimeField(null=True, blank=True)
+
+    # Since the worker started, see `events.metrics.OutboxStats`; the
+    # `RETIRED_WORKERS` row sums the workers pruned so far
+    sent_count = models.PositiveBigIntegerField(default=0)
+    failed_count = models.PositiveBigIntegerField(default=0)
+    retries_count = models.PositiveBigIntegerField(default=0)
+    deferred_count = models.PositiveBigIntegerField(default=0)
+    latency_buckets = models.JSONField(default=list)
+    latency_sum = models.FloatField(default=0)
+    latency_count = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Outbox worker {self.name} (last seen {self.heartbeat_at})"
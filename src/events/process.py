@@ -0,0 +1,22 @@
+"""
+Entry point of outbox worker processes.
+
+Kept free of model imports: spawned processes unpickle the target before
+Django is set up.
+"""
+import django
+
+
+def run_outbox_worker_process(
+        batch_size: int, concurrency: int, send_batch_size: int, rate_limit: float
+    ) -> None:
+    django.setup()
+
+    from .worker import process_outbox
+
+    process_outbox(
+        batch_size=batch_size,
+        concurrency=concurrency,
+        send_batch_size=send_batch_size,
+        rate_limit=rate_limit,
+    )
@@ -1,48 +1,114 @@
+import json
 import logging
 import random
 import string
-from uuid import uuid4
+from uuid import UUID, uuid4
 
-from django.db import transaction
+from django.db import connection
 
-from .exceptions import AlreadyRegisteredError, EventClosedError
+from .exceptions import AlreadyRegisteredError, EventClosedError, EventNotFoundError
+from .listeners import OUTBOX_CHANNEL
 from .models import Event, EventRegistration, OutboxMessage
 
 logger = logging.getLogger(__name__)
 
+REGISTRATION_TOPIC = "event_registration_created"
+
 
 def generate_confirmation_code(length=8):
     return "".join(random.choices(string.ascii_uppercase + string.digits, k=length))
 
 
-def register_event(event: Event, full_name: str, email: str) -> None:
-    if event.status != Event.Status.OPEN:
-        raise EventClosedError("Event is not open for registration.")
+def register_event(event_id: UUID | str, full_name: str, email: str) -> UUID:
+    """
+    Register `email` for an open event and queue its confirmation message,
+    returning the registration id.
+
+    One statement checks the event, inserts the registration and its
+    outbox message and notifies the outbox workers, so it is atomic
+    without a transaction block. The event row is share-locked, so it
+    can't be closed in between; a duplicate email is caught by the
+    `(event, email)` unique constraint instead of a prior lookup.
+    """
+    try:
+        event_id = UUID(str(event_id))
+    except ValueError:
+        raise EventNotFoundError() from None
 
-    with transaction.atomic():
-        registration, created = EventRegistration.objects.get_or_create(
-            event=event,
-            email=email,
-            defaults={
+    registration_id = uuid4()
+    message_id = uuid4()
+    confirmation_code = generate_confirmation_code()
+    payload = {
+        "message_id": str(message_id),
+        "registration_id": str(registration_id),
+        "event_id": str(event_id),
+        "full_name": full_name,
+        "email": email,
+        "email_message": f"Код подтверждения: {confirmation_code}",
+    }
+
+    event_table = Event._meta.db_table
+    registration_table = EventRegistration._meta.db_table
+    outbox_table = OutboxMessage._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH event AS (
+                SELECT id, status FROM {event_table}
+                WHERE id = %(event_id)s
+                FOR SHARE
+            ),
+            registration AS (
+                INSERT INTO {registration_table} (
+                    id, event_id, full_name, email, confirmation_code,
+                    confirmed, created_at, updated_at
+                )
+                SELECT %(registration_id)s, id, %(full_name)s, %(email)s,
+                       %(confirmation_code)s, false, now(), now()
+                FROM event
+                WHERE status = %(open)s
+                ON CONFLICT (event_id, email) DO NOTHING
+                RETURNING id
+            ),
+            message AS (
+                INSERT INTO {outbox_table} (
+                    id, topic, payload, sent, sent_at, lease_owner,
+                    lease_expires_at, attempts, next_attempt_at, last_error,
+                    dead_letter, created_at
+                )
+                SELECT %(message_id)s, %(topic)s, %(payload)s::jsonb, false,
+                       NULL, '', NULL, 0, now(), '', false, now()
+                FROM registration
+                RETURNING id
+            ),
+            notified AS (
+                SELECT pg_notify(%(channel)s, id::text) FROM message
+            )
+            SELECT
+                (SELECT status FROM event),
+                (SELECT count(*) FROM registration),
+                (SELECT count(*) FROM notified)
+            """,
+            {
+                "event_id": event_id,
+                "registration_id": registration_id,
                 "full_name": full_name,
-                "confirmation_code": generate_confirmation_code()
-            }
+                "email": email,
+                "confirmation_code": confirmation_code,
+                "open": Event.Status.OPEN,
+                "message_id": message_id,
+                "topic": REGISTRATION_TOPIC,
+                "payload": json.dumps(payload),
+                "channel": OUTBOX_CHANNEL,
+            },
         )
+        event_status, registered, _ = cursor.fetchone()
 
-        if not created:
-            raise AlreadyRegisteredError("You are already registered for this event.")
-
-        message_id = uuid4()
-        OutboxMessage.objects.create(
-            id=message_id,
-            topic="event_registration_created",
-            payload={
-                "message_id": str(message_id),
-                "registration_id": str(registration.id),
-                "event_id": str(registration.event.id),
-                "full_name": registration.full_name,
-                "email": registration.email,
-                "email_message": f"Код подтверждения: {registration.confirmation_code}",
-            }
-        )
+    if event_status is None:
+        raise EventNotFoundError()
+    if event_status != Event.Status.OPEN:
+        raise EventClosedError("Event is not open for registration.")
+    if not registered:
+        raise AlreadyRegisteredError("You are already registered for this event.")
 
+    return registration_id
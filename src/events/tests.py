@@ -1,3 +1,471 @@
-from django.test import TestCase
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
+from uuid import uuid4
 
-# Create your tests here.
+import httpx
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from events.exceptions import (
+    AlreadyRegisteredError,
+    EventClosedError,
+    EventNotFoundError,
+)
+from events.fake_notifications import FakeNotifications
+from events.models import (
+    Event,
+    EventRegistration,
+    OutboxMessage,
+    OutboxMessageArchive,
+    Venue,
+)
+from events.services import REGISTRATION_TOPIC, register_event
+from events.throttling import CircuitBreaker, Throttle, TokenBucket
+from events.worker import (
+    BatchDelivery,
+    DispatchResult,
+    archive_outbox,
+    claim_messages,
+    mark_deferred,
+    mark_failed,
+    mark_sent,
+    process_outbox_batch,
+    start_outbox_workers,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ThrottlingTestCase(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch("events.throttling.time.monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class TokenBucketTests(ThrottlingTestCase):
+    def test_no_limit(self):
+        bucket = TokenBucket(0, 1)
+        self.assertTrue(all(bucket.try_acquire() for _ in range(100)))
+        self.assertIsNone(bucket.available())
+        self.assertEqual(bucket.wait_seconds(), 0)
+
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(10, 3)
+        self.assertEqual(bucket.available(), 3)
+        self.assertTrue(all(bucket.try_acquire() for _ in range(3)))
+        self.assertFalse(bucket.try_acquire())
+        self.assertAlmostEqual(bucket.wait_seconds(), 0.1)
+
+        self.clock.now += 0.1
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+
+    def test_refill_is_capped_at_burst(self):
+        bucket = TokenBucket(10, 3)
+        bucket.try_acquire()
+        self.clock.now += 60
+        self.assertEqual(bucket.available(), 3)
+
+
+class CircuitBreakerTests(ThrottlingTestCase):
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(3, 30)
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.State.CLOSED)
+        self.assertTrue(breaker.allow())
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.State.OPEN)
+        self.assertFalse(breaker.allow())
+        self.assertEqual(breaker.wait_seconds(), 30)
+
+    def test_half_open_probe_closes(self):
+        breaker = CircuitBreaker(1, 30)
+        breaker.record_failure()
+        self.clock.now += 30
+
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, CircuitBreaker.State.HALF_OPEN)
+        # The probe is in flight
+        self.assertFalse(breaker.allow())
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.State.CLOSED)
+        self.assertTrue(breaker.allow())
+
+    def test_half_open_probe_reopens(self):
+        breaker = CircuitBreaker(5, 30)
+        for _ in range(5):
+            breaker.record_failure()
+        self.clock.now += 30
+        self.assertTrue(breaker.allow())
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.State.OPEN)
+        self.assertEqual(breaker.wait_seconds(), 30)
+
+    def test_disabled(self):
+        breaker = CircuitBreaker(0, 30)
+        for _ in range(100):
+            breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.State.CLOSED)
+        self.assertTrue(breaker.allow())
+
+
+class ThrottleTests(ThrottlingTestCase):
+    def test_open_breaker_spends_no_tokens(self):
+        throttle = Throttle(TokenBucket(1, 2), CircuitBreaker(1, 30))
+        throttle.record(ok=False)
+        self.assertEqual(throttle.admit(), 30)
+
+        self.clock.now += 30
+        self.assertEqual(throttle.admit(), 0)
+        # Half-open with the probe in flight
+        self.assertEqual(throttle.admit(), 1.0)
+        self.assertEqual(throttle.limiter.available(), 1)
+
+    def test_refused_token_gives_back_probe(self):
+        throttle = Throttle(TokenBucket(2, 1), CircuitBreaker(1, 30))
+        throttle.record(ok=False)
+        self.clock.now += 30
+        throttle.limiter.try_acquire()
+
+        # Admitted by the breaker, then refused by the limiter
+        self.assertEqual(throttle.admit(), 0.5)
+        self.clock.now += 0.5
+        self.assertEqual(throttle.admit(), 0)
+
+
+class RegisterEventTests(TestCase):
+    def setUp(self):
+        self.event = Event.objects.create(
+            name="Концерт",
+            event_time=timezone.now() + timedelta(days=30),
+            registration_deadline=timezone.now() + timedelta(days=29),
+            venue=Venue.objects.create(name="Площадка"),
+        )
+
+    def test_registers(self):
+        registration_id = register_event(self.event.pk, "Иван", "ivan@example.com")
+
+        registration = EventRegistration.objects.get()
+        self.assertEqual(registration.pk, registration_id)
+        self.assertEqual(registration.event, self.event)
+        self.assertEqual(registration.email, "ivan@example.com")
+
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.topic, REGISTRATION_TOPIC)
+        self.assertEqual(message.payload["registration_id"], str(registration_id))
+        self.assertEqual(message.payload["email"], "ivan@example.com")
+        self.assertIn(registration.confirmation_code, message.payload["email_message"])
+
+    def test_not_found(self):
+        for event_id in (uuid4(), "not-a-uuid"):
+            with self.assertRaises(EventNotFoundError):
+                register_event(event_id, "Иван", "ivan@example.com")
+        self.assertFalse(EventRegistration.objects.exists())
+
+    def test_closed(self):
+        Event.objects.filter(pk=self.event.pk).update(status=Event.Status.CLOSED)
+        with self.assertRaises(EventClosedError):
+            register_event(self.event.pk, "Иван", "ivan@example.com")
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_already_registered(self):
+        register_event(self.event.pk, "Иван", "ivan@example.com")
+        with self.assertRaises(AlreadyRegisteredError):
+            register_event(str(self.event.pk), "Иван", "ivan@example.com")
+        self.assertEqual(EventRegistration.objects.count(), 1)
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+
+
+def make_message(**fields) -> OutboxMessage:
+    return OutboxMessage.objects.create(
+        id=uuid4(),
+        topic=REGISTRATION_TOPIC,
+        payload={"email": "ivan@example.com", "email_message": "Код: 1234"},
+        **fields,
+    )
+
+
+class ArchiveOutboxTests(TestCase):
+    def test_moves_old_sent_messages(self):
+        now = timezone.now()
+        old = [
+            make_message(sent=True, sent_at=now - timedelta(days=40), attempts=2)
+            for _ in range(5)
+        ]
+        recent = make_message(sent=True, sent_at=now - timedelta(days=1))
+        pending = make_message()
+
+        self.assertEqual(archive_outbox(now - timedelta(days=30), chunk_size=2), 5)
+        self.assertEqual(
+            set(OutboxMessage.objects.values_list("pk", flat=True)),
+            {recent.pk, pending.pk},
+        )
+        archived = OutboxMessageArchive.objects.get(pk=old[0].pk)
+        self.assertEqual(archived.payload, old[0].payload)
+        self.assertEqual(archived.attempts, 2)
+
+    def test_archived_id_is_overwritten(self):
+        now = timezone.now()
+        message = make_message(sent=True, sent_at=now - timedelta(days=40))
+        OutboxMessageArchive.objects.create(
+            id=message.pk, topic="stale", payload={}, created_at=now
+        )
+
+        self.assertEqual(archive_outbox(now - timedelta(days=30)), 1)
+        self.assertFalse(OutboxMessage.objects.exists())
+        archived = OutboxMessageArchive.objects.get()
+        self.assertEqual(archived.topic, REGISTRATION_TOPIC)
+        self.assertEqual(archived.payload, message.payload)
+
+
+class OutboxTestCase(TestCase):
+    def setUp(self):
+        # now() in SQL is the start of the test's transaction
+        self.past = timezone.now() - timedelta(minutes=1)
+
+    def make_due(self, **fields) -> OutboxMessage:
+        return make_message(next_attempt_at=self.past, **fields)
+
+    def claim(self, owner: str = "worker-1") -> OutboxMessage:
+        (message,) = claim_messages(owner, 1)
+        return message
+
+
+class ClaimMessagesTests(OutboxTestCase):
+    def test_leases_oldest_due_messages(self):
+        due = [self.make_due() for _ in range(3)]
+        self.make_due(sent=True, sent_at=self.past)
+        self.make_due(dead_letter=True)
+        make_message(next_attempt_at=timezone.now() + timedelta(hours=1))
+        self.make_due(
+            lease_owner="worker-2",
+            lease_expires_at=timezone.now() + timedelta(hours=1),
+        )
+
+        claimed = claim_messages("worker-1", 2, lease_seconds=60)
+        self.assertEqual([message.pk for message in claimed], [due[0].pk, due[1].pk])
+        for message in claimed:
+            self.assertEqual(message.lease_owner, "worker-1")
+            self.assertIsNotNone(message.lease_expires_at)
+
+        self.assertEqual([m.pk for m in claim_messages("worker-3", 10)], [due[2].pk])
+        self.assertEqual(claim_messages("worker-3", 10), [])
+
+    def test_expired_lease_is_claimed_again(self):
+        message = self.make_due(lease_owner="crashed", lease_expires_at=self.past)
+        self.assertEqual(self.claim().pk, message.pk)
+        message.refresh_from_db()
+        self.assertEqual(message.lease_owner, "worker-1")
+
+    def test_sent_releases_lease(self):
+        message = self.make_due()
+        self.claim()
+        mark_sent([DispatchResult(message.pk, sent=True)])
+
+        message.refresh_from_db()
+        self.assertTrue(message.sent)
+        self.assertIsNotNone(message.sent_at)
+        self.assertEqual(message.lease_owner, "")
+        self.assertIsNone(message.lease_expires_at)
+
+    def test_lost_lease_results_are_dropped(self):
+        message = self.make_due()
+        self.claim()
+        # The lease expired and another worker claimed the message
+        OutboxMessage.objects.filter(pk=message.pk).update(lease_owner="worker-2")
+
+        with self.assertLogs("events.worker", "WARNING") as logs:
+            mark_failed([DispatchResult(message.pk, sent=False, error="503")], "worker-1")
+            mark_deferred(
+                [DispatchResult(message.pk, sent=False, defer_seconds=5)], "worker-1"
+            )
+        self.assertEqual(len(logs.records), 2)
+
+        message.refresh_from_db()
+        self.assertEqual(message.attempts, 0)
+        self.assertEqual(message.last_error, "")
+        self.assertEqual(message.lease_owner, "worker-2")
+
+
+class MarkFailedTests(OutboxTestCase):
+    def fail(
+            self, message: OutboxMessage, retryable: bool = True, max_attempts: int = 10
+        ) -> None:
+        # Each attempt is made under a new lease of the same worker
+        OutboxMessage.objects.filter(pk=message.pk).update(lease_owner="worker-1")
+        mark_failed(
+            [DispatchResult(message.pk, sent=False, error="503", retryable=retryable)],
+            "worker-1",
+            max_attempts=max_attempts,
+            backoff_seconds=10,
+            max_backoff_seconds=60,
+        )
+        message.refresh_from_db()
+
+    def db_now(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT now()")
+            return cursor.fetchone()[0]
+
+    def test_backoff_doubles_up_to_max(self):
+        message = self.make_due()
+        for attempts, backoff in enumerate((10, 20, 40, 60, 60), start=1):
+            self.fail(message)
+            self.assertEqual(message.attempts, attempts)
+            self.assertEqual(
+                message.next_attempt_at - self.db_now(), timedelta(seconds=backoff)
+            )
+            self.assertEqual(message.last_error, "503")
+            self.assertEqual(message.lease_owner, "")
+            self.assertIsNone(message.lease_expires_at)
+            self.assertFalse(message.dead_letter)
+
+    def test_dead_letter_after_max_attempts(self):
+        message = self.make_due()
+        self.fail(message, max_attempts=3)
+        self.fail(message, max_attempts=3)
+        self.assertFalse(message.dead_letter)
+
+        self.fail(message, max_attempts=3)
+        self.assertTrue(message.dead_letter)
+        self.assertEqual(message.attempts, 3)
+
+        OutboxMessage.objects.filter(pk=message.pk).update(next_attempt_at=self.past)
+        self.assertEqual(claim_messages("worker-1", 10), [])
+
+    def test_rejected_message_is_dead_lettered_at_once(self):
+        message = self.make_due()
+        self.fail(message, retryable=False)
+        self.assertTrue(message.dead_letter)
+        self.assertEqual(message.attempts, 1)
+
+    def test_deferred_send_counts_no_attempt(self):
+        message = self.make_due()
+        self.claim()
+        mark_deferred(
+            [DispatchResult(message.pk, sent=False, defer_seconds=2.5)], "worker-1"
+        )
+
+        message.refresh_from_db()
+        self.assertEqual(message.attempts, 0)
+        self.assertEqual(message.next_attempt_at - self.db_now(), timedelta(seconds=2.5))
+        self.assertEqual(message.lease_owner, "")
+
+
+class BatchDeliveryTests(OutboxTestCase):
+    """Sends through `FakeNotifications`, in process."""
+
+    def setUp(self):
+        super().setUp()
+        self.executor = ThreadPoolExecutor(4)
+        self.addCleanup(self.executor.shutdown)
+
+    def send(self, fake: FakeNotifications, batches: BatchDelivery) -> list:
+        client = httpx.Client(transport=fake.transport())
+        self.addCleanup(client.close)
+        with override_settings(NOTIFICATIONS_API_URL=fake.url):
+            return process_outbox_batch(
+                client, self.executor, "worker-1", 100, batches=batches
+            )
+
+    def test_sends_in_batches(self):
+        messages = [self.make_due() for _ in range(7)]
+        fake = FakeNotifications()
+
+        results = self.send(fake, BatchDelivery(fake.batch_url, 3))
+        self.assertEqual(len(results), 7)
+        self.assertTrue(all(result.sent for result in results))
+        self.assertEqual(fake.requests_count, 3)
+        self.assertEqual(
+            set(fake.delivered), {str(message.pk) for message in messages}
+        )
+        self.assertEqual(OutboxMessage.objects.filter(sent=True).count(), 7)
+
+    def test_falls_back_to_single_sends(self):
+        self.make_due()
+        self.make_due()
+        fake = FakeNotifications(batch=False)
+        batches = BatchDelivery(fake.batch_url, 3)
+
+        results = self.send(fake, batches)
+        self.assertFalse(batches.supported)
+        self.assertTrue(all(result.sent for result in results))
+        # One refused batch, then a request per message
+        self.assertEqual(fake.requests_count, 3)
+        self.assertEqual(OutboxMessage.objects.filter(sent=True).count(), 2)
+
+    def test_failed_notifications_are_retried(self):
+        messages = [self.make_due() for _ in range(4)]
+        fake = FakeNotifications(failure_rate=0.5, seed=1)
+
+        results = self.send(fake, BatchDelivery(fake.batch_url, 4))
+        failed = {result.message_id for result in results if not result.sent}
+        self.assertTrue(0 < len(failed) < 4)
+        self.assertEqual(fake.requests_count, 1)
+
+        for message in messages:
+            message.refresh_from_db()
+            self.assertEqual(message.sent, message.pk not in failed)
+            self.assertEqual(message.attempts, int(message.pk in failed))
+            self.assertFalse(message.dead_letter)
+
+
+def exit_worker(*args) -> None:
+    sys.exit(3)
+
+
+class StartOutboxWorkersTests(SimpleTestCase):
+    def setUp(self):
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            self.addCleanup(signal.signal, signum, signal.getsignal(signum))
+
+        # Forked workers run the patched target without setting up Django
+        for patcher in (
+            mock.patch(
+                "events.worker.multiprocessing.get_context",
+                return_value=multiprocessing.get_context("fork"),
+            ),
+            mock.patch("events.worker.run_outbox_worker_process", exit_worker),
+            mock.patch("events.worker.WORKER_RESTART_SECONDS", 0.05),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_restarts_exited_workers_until_stopped(self):
+        timer = threading.Timer(0.5, os.kill, [os.getpid(), signal.SIGTERM])
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        with self.assertLogs("events.worker", "WARNING") as logs:
+            start_outbox_workers(2, batch_size=10, concurrency=1)
+
+        self.assertIn(
+            "ERROR:events.worker:outbox-worker-0 exited with code 3", logs.output
+        )
+        for number in range(2):
+            restarts = logs.output.count(
+                f"WARNING:events.worker:Restarting outbox-worker-{number}"
+            )
+            self.assertGreater(restarts, 1)
@@ -0,0 +1,177 @@
+import logging
+import threading
+import time
+from enum import StrEnum
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Allows `rate` requests per second on average and bursts of up to
+    `burst`. A `rate` of 0 allows everything. Shared by the sending
+    threads of a worker process, not between processes.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available, never waiting for it."""
+        if not self.rate:
+            return True
+
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def available(self) -> int | None:
+        """Whole tokens available now, None without a limit."""
+        if not self.rate:
+            return None
+
+        with self._lock:
+            self._refill()
+            return int(self._tokens)
+
+    def wait_seconds(self) -> float:
+        """Seconds until a token is available."""
+        if not self.rate:
+            return 0.0
+
+        with self._lock:
+            self._refill()
+            return max((1 - self._tokens) / self.rate, 0.0)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self._tokens + (now - self._updated) * self.rate, self.burst
+        )
+        self._updated = now
+
+
+class CircuitBreaker:
+    """
+    Stops requests to a failing service.
+
+    After `threshold` failures in a row the breaker opens and denies
+    requests for `reset_seconds`. It then half-opens: up to `probes`
+    requests go through, and the first result closes it again or reopens
+    it. A `threshold` of 0 disables the breaker.
+    """
+
+    class State(StrEnum):
+        CLOSED = "closed"
+        OPEN = "open"
+        HALF_OPEN = "half_open"
+
+    def __init__(self, threshold: int, reset_seconds: float, probes: int = 1):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.probes = probes
+        self.state = self.State.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a request may be made now; a half-open probe if so."""
+        if not self.threshold:
+            return True
+
+        with self._lock:
+            if self.state == self.State.OPEN:
+                if time.monotonic() < self._opened_at + self.reset_seconds:
+                    return False
+                self.state = self.State.HALF_OPEN
+                self._probes_in_flight = 0
+                logger.info("Notifications API circuit half-open, probing")
+
+            if self.state == self.State.HALF_OPEN:
+                if self._probes_in_flight >= self.probes:
+                    return False
+                self._probes_in_flight += 1
+            return True
+
+    def release(self) -> None:
+        """Give back a probe `allow` granted for a request that wasn't made."""
+        with self._lock:
+            if self.state == self.State.HALF_OPEN and self._probes_in_flight:
+                self._probes_in_flight -= 1
+
+    def wait_seconds(self) -> float:
+        """Seconds until the breaker lets a request through again."""
+        with self._lock:
+            if self.state != self.State.OPEN:
+                return 0.0
+            return max(self._opened_at + self.reset_seconds - time.monotonic(), 0.0)
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.State.CLOSED:
+                logger.info("Notifications API circuit closed")
+            self.state = self.State.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        if not self.threshold:
+            return
+
+        with self._lock:
+            self._failures += 1
+            if self.state == self.State.HALF_OPEN or (
+                self.state == self.State.CLOSED and self._failures >= self.threshold
+            ):
+                logger.warning(
+                    f"Notifications API circuit open for {self.reset_seconds}s "
+                    f"after {self._failures} failures"
+                )
+                self.state = self.State.OPEN
+                self._opened_at = time.monotonic()
+
+
+class Throttle:
+    """
+    Guards notification requests with a `TokenBucket` and a
+    `CircuitBreaker`. Requests that aren't admitted are deferred by the
+    caller rather than waited for.
+    """
+
+    def __init__(self, limiter: TokenBucket, breaker: CircuitBreaker):
+        self.limiter = limiter
+        self.breaker = breaker
+
+    def admit(self) -> float:
+        """
+        Return 0 if a request may be made now, otherwise the seconds after
+        which to try again.
+        """
+        if wait := self.breaker.wait_seconds():
+            return wait
+        # The breaker goes first, so no token is spent on a refused request
+        if not self.breaker.allow():
+            # Half-open and the probes are in flight
+            return 1.0
+        if not self.limiter.try_acquire():
+            self.breaker.release()
+            return max(self.limiter.wait_seconds(), 0.1)
+        return 0.0
+
+    def wait_seconds(self) -> float:
+        """Seconds until the next request could be admitted."""
+        return max(self.breaker.wait_seconds(), self.limiter.wait_seconds())
+
+    def record(self, ok: bool) -> None:
+        if ok:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
@@ -1,8 +1,12 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from .views import EventViewSet
+from .views import EventViewSet, outbox_metrics
 
 router = DefaultRouter()
 router.register(r"", EventViewSet, basename="events")
 
-urlpatterns = router.urls
+urlpatterns = [
+    path("outbox/metrics/", outbox_metrics, name="outbox-metrics"),
+    *router.urls,
+]
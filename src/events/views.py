@@ -1,15 +1,16 @@
 from django.conf import settings
-from django.shortcuts import get_object_or_404
+from django.http import HttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
 from rest_framework.authentication import SessionAuthentication
-from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
-from .exceptions import AlreadyRegisteredError, EventClosedError
+from .exceptions import AlreadyRegisteredError, EventClosedError, EventNotFoundError
 from .filters import EventFilter
+from .metrics import PROMETHEUS_CONTENT_TYPE, collect_outbox_metrics
 from .models import Event
 from .pagination import EventPagination
 from .serializers import EventRegistrationSerializer, EventSerializer
@@ -38,11 +39,9 @@ class EventViewSet(viewsets.ReadOnlyModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        event = get_object_or_404(Event, pk=pk)
-
         try:
             register_event(
-                event,
+                pk,
                 serializer.validated_data["full_name"],
                 serializer.validated_data["email"],
             )
@@ -50,6 +49,11 @@ class EventViewSet(viewsets.ReadOnlyModelViewSet):
                 {"detail": "Succefully registered"},
                 status=status.HTTP_200_OK
             )
+        except EventNotFoundError as e:
+            return Response(
+                {"detail": str(e)},
+                status=status.HTTP_404_NOT_FOUND
+            )
         except EventClosedError as e:
             return Response(
                 {"detail": str(e)},
@@ -60,3 +64,12 @@ class EventViewSet(viewsets.ReadOnlyModelViewSet):
                 {"detail": str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def outbox_metrics(request):
+    """Outbox lag and throughput in the Prometheus text format."""
+    return HttpResponse(
+        collect_outbox_metrics(), content_type=PROMETHEUS_CONTENT_TYPE
+    )
@@ -1,71 +1,753 @@
 import logging
+import math
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import socket
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID, uuid4
 
 from django.conf import settings
-from django.db import DatabaseError, transaction
+from django.db import DatabaseError, connection
 from django.utils import timezone
-from httpx import HTTPStatusError, RequestError
-from tenacity import (
-    RetryError,
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
-)
+from httpx import HTTPStatusError, RequestError, Response
 
-from core.http_clients import EventApiClient
+from core.http_clients import EventApiClient, get_api_client
 
-from .models import OutboxMessage
+from .listeners import OutboxListener
+from .metrics import OutboxStats
+from .models import OutboxMessage, OutboxMessageArchive, OutboxWorker
+from .process import run_outbox_worker_process
+from .throttling import CircuitBreaker, Throttle, TokenBucket
 
 logger = logging.getLogger(__name__)
 
-def process_outbox(batch_size=100, sleep_seconds=5):
-    while True:
-        with transaction.atomic():
-            messages = (OutboxMessage.objects
-                        .filter(sent=False)
-                        .select_for_update(skip_locked=True)
-                        .order_by("created_at")[:batch_size])
-            
-            with EventApiClient() as client:
-                for msg in messages:
-                    try:
-                        payload = {
-                            "id": str(msg.id),
-                            "email": msg.payload["email"],
-                            "message": msg.payload["email_message"],
-                        }
-
-                        make_notification_request(client, payload)
-
-                        msg.sent = True
-                        msg.sent_at = timezone.now()
-                        msg.save()
-                    except (HTTPStatusError, RequestError, RetryError) as e:
-                        logger.exception(
-                            f"Unable to send outbox message ({msg.id}): {e}"
-                        )
-                        raise
-                    except (DatabaseError) as e:
-                        logger.exception(
-                            f"Database error while saving outbox message {msg.id}: {e}"
-                        )
-
-        time.sleep(sleep_seconds)
-
-
-@retry(
-    stop=stop_after_attempt(5),
-    wait=wait_exponential(multiplier=1, min=1, max=10),
-    retry=retry_if_exception_type((RequestError, HTTPStatusError))
-)
+
+@dataclass(slots=True)
+class DispatchResult:
+    message_id: UUID
+    sent: bool
+    error: str = ""
+    # False when sending again can't help, e.g. the API rejected the message
+    retryable: bool = True
+    # Set when the send was deferred by the `Throttle` instead of attempted
+    defer_seconds: float = 0.0
+
+
+@dataclass(slots=True)
+class BatchDelivery:
+    """
+    Sends notifications `size` at a time to `url`, the batch endpoint of
+    the notifications API.
+
+    The endpoint takes `{"notifications": [...]}` and answers `{"results":
+    [{"id": ..., "status": ..., "error": ...}, ...]}`, a status per
+    notification. If it answers 404, 405 or 501, the worker goes back to
+    single sends.
+    """
+
+    url: str
+    size: int
+    supported: bool = True
+
+
+# Batch endpoint answers meaning it isn't supported
+BATCH_UNSUPPORTED_STATUSES = (404, 405, 501)
+
+# Delay before a worker process that exited unexpectedly is started again
+WORKER_RESTART_SECONDS = 5
+
+# Request timeouts, in seconds, of single and batch sends
+NOTIFICATION_TIMEOUT = 10
+BATCH_NOTIFICATION_TIMEOUT = 30
+
+
+def process_outbox(
+        batch_size=100,
+        poll_seconds=settings.OUTBOX_POLL_SECONDS,
+        concurrency=settings.OUTBOX_CONCURRENCY,
+        heartbeat_seconds=settings.OUTBOX_HEARTBEAT_SECONDS,
+        send_batch_size=settings.OUTBOX_SEND_BATCH_SIZE,
+        rate_limit=settings.OUTBOX_COMMAND_RATE_LIMIT,
+    ):
+    """
+    Send outbox messages until SIGTERM or SIGINT is received.
+
+    Between batches the worker waits for a notification from
+    `register_event`, at most until the next retry is due or
+    `poll_seconds` have passed. A signal lets the batch being sent finish
+    and be recorded, so no message is left leased, then the worker exits.
+    The worker's `OutboxWorker` row gets a heartbeat every
+    `heartbeat_seconds`, even while idle. Notifications are sent
+    `send_batch_size` at a time if the API has a batch endpoint.
+
+    Requests go through a `Throttle`: at most `rate_limit` per second, and
+    none while the circuit breaker is open. Claiming pauses meanwhile, and
+    sends it doesn't admit are deferred without counting an attempt.
+    """
+    # Unique per start: pids come back, e.g. in containers
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+    batches = None
+    if settings.NOTIFICATIONS_API_BATCH_URL and send_batch_size > 1:
+        batches = BatchDelivery(settings.NOTIFICATIONS_API_BATCH_URL, send_batch_size)
+    throttle = Throttle(
+        TokenBucket(rate_limit, settings.OUTBOX_RATE_BURST),
+        CircuitBreaker(
+            settings.OUTBOX_BREAKER_THRESHOLD, settings.OUTBOX_BREAKER_RESET_SECONDS
+        ),
+    )
+    stopping = threading.Event()
+    # Keeps `concurrency` connections alive if the pool settings allow it
+    client = get_api_client()
+    with (
+        ThreadPoolExecutor(concurrency, thread_name_prefix="outbox") as executor,
+        OutboxListener() as listener,
+    ):
+        def stop(*args):
+            logger.info(f"Outbox worker {owner} stopping")
+            stopping.set()
+            listener.wake()
+
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, stop)
+
+        heartbeat = Heartbeat(owner, heartbeat_seconds)
+        try:
+            while not stopping.is_set():
+                if wait := throttle.wait_seconds():
+                    listener.wait(min(wait, heartbeat.until_due()))
+                    heartbeat.record([])
+                    continue
+
+                claim_size = get_claim_size(batch_size, throttle, batches)
+                results = process_outbox_batch(
+                    client,
+                    executor,
+                    owner,
+                    claim_size,
+                    lease_seconds=get_lease_seconds(claim_size, concurrency, batches),
+                    stats=heartbeat.stats,
+                    batches=batches,
+                    throttle=throttle,
+                )
+                heartbeat.record(results)
+                # A full batch means more messages are probably waiting
+                if len(results) < claim_size and not stopping.is_set():
+                    listener.wait(
+                        min(get_idle_timeout(poll_seconds), heartbeat.until_due())
+                    )
+        finally:
+            heartbeat.stop()
+
+    logger.info(f"Outbox worker {owner} stopped")
+
+
+class Heartbeat:
+    """
+    Keeps the `OutboxWorker` row of a worker up to date. `stats` are
+    gathered in memory and written with the heartbeat, so a busy worker
+    doesn't write after every batch.
+    """
+
+    def __init__(self, owner: str, interval: float):
+        self.interval = interval
+        self.stats = OutboxStats()
+        now = timezone.now()
+        self.worker = OutboxWorker.objects.create(
+            name=owner, started_at=now, heartbeat_at=now, **self.stats.as_fields()
+        )
+        self.last_beat = time.monotonic()
+
+    def record(self, results: list[DispatchResult]) -> None:
+        self.stats.count_results(results)
+        if not self.until_due():
+            self.beat()
+
+    def until_due(self) -> float:
+        """Seconds until the next heartbeat is due."""
+        return max(self.last_beat + self.interval - time.monotonic(), 0.0)
+
+    def beat(self, **fields) -> None:
+        try:
+            OutboxWorker.objects.filter(pk=self.worker.pk).update(
+                heartbeat_at=timezone.now(), **self.stats.as_fields(), **fields
+            )
+        except DatabaseError as e:
+            # The totals are written by the next heartbeat
+            logger.warning(f"Outbox worker heartbeat failed: {e}")
+            return
+
+        self.last_beat = time.monotonic()
+
+    def stop(self) -> None:
+        self.beat(stopped_at=timezone.now())
+
+
+def start_outbox_workers(
+        processes: int,
+        batch_size: int,
+        concurrency: int,
+        send_batch_size: int = settings.OUTBOX_SEND_BATCH_SIZE,
+        rate_limit: float = settings.OUTBOX_COMMAND_RATE_LIMIT,
+    ) -> None:
+    """
+    Run `processes` outbox worker processes until SIGTERM or SIGINT, which
+    is passed on to them, and wait for them to drain and exit. They share
+    `rate_limit` evenly. A worker that exits before that, e.g. after a
+    database error, is started again after `WORKER_RESTART_SECONDS`.
+    """
+    context = multiprocessing.get_context("spawn")
+    stopping = threading.Event()
+
+    def start(number: int):
+        worker = context.Process(
+            target=run_outbox_worker_process,
+            args=(batch_size, concurrency, send_batch_size, rate_limit / processes),
+            name=f"outbox-worker-{number}",
+        )
+        worker.start()
+        return worker
+
+    def stop(*args):
+        stopping.set()
+        for worker in list(workers.values()):
+            if worker.is_alive():
+                worker.terminate()
+
+    workers = {}
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, stop)
+
+    for number in range(processes):
+        workers[number] = start(number)
+    while workers:
+        multiprocessing.connection.wait(
+            [worker.sentinel for worker in workers.values()]
+        )
+        for number, worker in list(workers.items()):
+            if worker.exitcode is None:
+                continue
+            del workers[number]
+            if worker.exitcode:
+                logger.error(f"{worker.name} exited with code {worker.exitcode}")
+            if stopping.is_set() or stopping.wait(WORKER_RESTART_SECONDS):
+                continue
+
+            logger.warning(f"Restarting {worker.name}")
+            workers[number] = start(number)
+            # The signal may have come while it was starting
+            if stopping.is_set():
+                workers[number].terminate()
+
+
+def get_idle_timeout(poll_seconds: float) -> float:
+    """Seconds until a retry or an expired lease makes a message due."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT extract(epoch FROM min(
+                greatest(next_attempt_at, coalesce(lease_expires_at, next_attempt_at))
+            ) - now())
+            FROM {OutboxMessage._meta.db_table}
+            WHERE NOT sent AND NOT dead_letter
+            """
+        )
+        until_due = cursor.fetchone()[0]
+
+    if until_due is None:
+        return poll_seconds
+    return min(max(float(until_due), 0.0), poll_seconds)
+
+
+def get_claim_size(
+        batch_size: int, throttle: Throttle, batches: BatchDelivery | None
+    ) -> int:
+    """
+    Messages to claim: no more than the rate limit lets through now, so
+    that few claimed messages have to be deferred.
+    """
+    tokens = throttle.limiter.available()
+    if tokens is None:
+        return batch_size
+    if batches is not None and batches.supported:
+        tokens *= batches.size
+    return max(min(batch_size, tokens), 1)
+
+
+def get_lease_seconds(
+        batch_size: int, concurrency: int, batches: BatchDelivery | None
+    ) -> int:
+    """
+    Lease for a claim of `batch_size` messages: long enough for all of its
+    requests to time out, `concurrency` at a time, and no shorter than
+    `OUTBOX_LEASE_SECONDS`.
+    """
+    if batches is not None and batches.supported:
+        requests = math.ceil(batch_size / batches.size)
+        timeout = BATCH_NOTIFICATION_TIMEOUT
+    else:
+        requests, timeout = batch_size, NOTIFICATION_TIMEOUT
+    rounds = math.ceil(requests / concurrency)
+    return max(settings.OUTBOX_LEASE_SECONDS, rounds * timeout)
+
+
+def process_outbox_batch(
+        client: EventApiClient,
+        executor: ThreadPoolExecutor,
+        owner: str,
+        batch_size: int,
+        lease_seconds: int = settings.OUTBOX_LEASE_SECONDS,
+        stats: OutboxStats | None = None,
+        batches: BatchDelivery | None = None,
+        throttle: Throttle | None = None,
+    ) -> list[DispatchResult]:
+    """Send one batch of unsent messages, returning the send results."""
+    messages = claim_messages(owner, batch_size, lease_seconds)
+
+    # No transaction is open while sending
+    results = dispatch_messages(
+        messages, client, executor, stats, batches, throttle
+    )
+    try:
+        mark_sent([result for result in results if result.sent])
+        mark_deferred(
+            [result for result in results if result.defer_seconds], owner
+        )
+        mark_failed(
+            [
+                result for result in results
+                if not result.sent and not result.defer_seconds
+            ],
+            owner,
+        )
+    except DatabaseError as e:
+        logger.exception(f"Database error while saving outbox messages: {e}")
+
+    return results
+
+
+def claim_messages(
+        owner: str,
+        batch_size: int,
+        lease_seconds: int = settings.OUTBOX_LEASE_SECONDS,
+    ) -> list[OutboxMessage]:
+    """
+    Lease up to `batch_size` of the oldest due messages to `owner`.
+
+    The claim is a single `UPDATE ... RETURNING`, committed right away, so
+    no row lock outlives it. Leased messages are skipped by other workers
+    until the lease expires, so a crashed worker's messages are claimed
+    again then.
+    """
+    table = OutboxMessage._meta.db_table
+    return list(OutboxMessage.objects.raw(
+        f"""
+        UPDATE {table}
+        SET lease_owner = %s,
+            lease_expires_at = now() + make_interval(secs => %s)
+        WHERE id IN (
+            SELECT id FROM {table}
+            WHERE NOT sent
+              AND NOT dead_letter
+              AND next_attempt_at <= now()
+              AND (lease_expires_at IS NULL OR lease_expires_at < now())
+            ORDER BY created_at
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING *
+        """,
+        [owner, lease_seconds, batch_size],
+    ))
+
+
+def dispatch_messages(
+        messages: list[OutboxMessage],
+        client: EventApiClient,
+        executor: ThreadPoolExecutor,
+        stats: OutboxStats | None = None,
+        batches: BatchDelivery | None = None,
+        throttle: Throttle | None = None,
+    ) -> list[DispatchResult]:
+    """
+    Send `messages` concurrently on the `executor` threads, in requests of
+    `batches.size` if given, returning one result per message. Failed
+    sends are logged and reported, not raised.
+    """
+    def send_one(msg):
+        return dispatch_message(msg, client, stats, throttle)
+
+    def send_batch(chunk):
+        return dispatch_batch(chunk, client, batches, stats, throttle)
+
+    if batches is None or not batches.supported:
+        return list(executor.map(send_one, messages))
+
+    chunks = [
+        messages[start:start + batches.size]
+        for start in range(0, len(messages), batches.size)
+    ]
+    results = []
+    for chunk, chunk_results in zip(
+        chunks, executor.map(send_batch, chunks), strict=True
+    ):
+        if chunk_results is None:
+            # No batch support, see `BatchDelivery`
+            chunk_results = list(executor.map(send_one, chunk))
+        results.extend(chunk_results)
+    return results
+
+
+def dispatch_message(
+        msg: OutboxMessage,
+        client: EventApiClient,
+        stats: OutboxStats | None = None,
+        throttle: Throttle | None = None,
+    ) -> DispatchResult:
+    try:
+        notification = build_notification(msg)
+    except KeyError as e:
+        logger.exception(f"Invalid outbox message ({msg.id}): {e}")
+        return DispatchResult(msg.id, sent=False, error=repr(e), retryable=False)
+
+    if throttle is not None and (defer_seconds := throttle.admit()):
+        return DispatchResult(msg.id, sent=False, defer_seconds=defer_seconds)
+
+    try:
+        make_notification_request(client, notification, stats=stats)
+    except (HTTPStatusError, RequestError) as e:
+        retryable = is_retryable(e)
+        if throttle is not None:
+            # A rejected message doesn't mean the API is failing
+            throttle.record(ok=not retryable)
+        logger.exception(f"Unable to send outbox message ({msg.id}): {e}")
+        return DispatchResult(msg.id, sent=False, error=repr(e), retryable=retryable)
+
+    if throttle is not None:
+        throttle.record(ok=True)
+    return DispatchResult(msg.id, sent=True)
+
+
+def dispatch_batch(
+        messages: list[OutboxMessage],
+        client: EventApiClient,
+        batches: BatchDelivery,
+        stats: OutboxStats | None = None,
+        throttle: Throttle | None = None,
+    ) -> list[DispatchResult] | None:
+    """
+    Send `messages` in one batch request, returning one result per message,
+    or None if the API turned out not to support batches.
+    """
+    results = []
+    notifications = {}
+    for msg in messages:
+        try:
+            notifications[str(msg.id)] = build_notification(msg)
+        except KeyError as e:
+            logger.exception(f"Invalid outbox message ({msg.id}): {e}")
+            results.append(
+                DispatchResult(msg.id, sent=False, error=repr(e), retryable=False)
+            )
+    if not notifications:
+        return results
+
+    if throttle is not None and (defer_seconds := throttle.admit()):
+        return results + [
+            DispatchResult(UUID(message_id), sent=False, defer_seconds=defer_seconds)
+            for message_id in notifications
+        ]
+
+    try:
+        resp = make_batch_notification_request(
+            client, batches.url, list(notifications.values()), stats=stats
+        )
+        statuses = {
+            item["id"]: item
+            for item in resp.json()["results"]
+            if isinstance(item, dict) and isinstance(item.get("id"), str)
+        }
+    except (HTTPStatusError, RequestError) as e:
+        if throttle is not None:
+            throttle.record(ok=not is_retryable(e))
+        if (
+            isinstance(e, HTTPStatusError)
+            and e.response.status_code in BATCH_UNSUPPORTED_STATUSES
+        ):
+            if batches.supported:
+                logger.warning(
+                    f"Notifications API batch endpoint answered "
+                    f"{e.response.status_code}, sending one by one"
+                )
+                batches.supported = False
+            return None
+        logger.exception(f"Unable to send {len(notifications)} outbox messages: {e}")
+        return results + [
+            DispatchResult(
+                UUID(message_id), sent=False, error=repr(e), retryable=is_retryable(e)
+            )
+            for message_id in notifications
+        ]
+    except (ValueError, KeyError, TypeError) as e:
+        if throttle is not None:
+            throttle.record(ok=False)
+        logger.exception(f"Invalid notifications API batch response: {e}")
+        return results + [
+            DispatchResult(UUID(message_id), sent=False, error=repr(e))
+            for message_id in notifications
+        ]
+
+    if throttle is not None:
+        throttle.record(ok=True)
+
+    for message_id in notifications:
+        item = statuses.get(message_id)
+        status = item.get("status") if item is not None else None
+        if item is None:
+            results.append(DispatchResult(
+                UUID(message_id), sent=False, error="Missing from the batch response"
+            ))
+        elif not isinstance(status, int) or isinstance(status, bool):
+            # Only this message is retried, the rest of the batch stands
+            logger.error(f"Invalid batch response item ({message_id}): {item!r}")
+            results.append(DispatchResult(
+                UUID(message_id), sent=False, error=f"Invalid status {status!r}"
+            ))
+        elif 200 <= status < 300:
+            results.append(DispatchResult(UUID(message_id), sent=True))
+        else:
+            logger.error(
+                f"Unable to send outbox message ({message_id}): "
+                f"{status} {item.get('error', '')}"
+            )
+            results.append(DispatchResult(
+                UUID(message_id),
+                sent=False,
+                error=f"{status}: {item.get('error', '')}",
+                retryable=is_retryable_status(status),
+            ))
+    return results
+
+
+def build_notification(msg: OutboxMessage) -> dict:
+    return {
+        "id": str(msg.id),
+        "email": msg.payload["email"],
+        "message": msg.payload["email_message"],
+    }
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Network errors and retryable statuses may pass later."""
+    if isinstance(error, HTTPStatusError):
+        return is_retryable_status(error.response.status_code)
+    return isinstance(error, RequestError)
+
+
+def is_retryable_status(status_code: int) -> bool:
+    """5xx, 408 and 429 may pass later, other 4xx won't."""
+    return status_code >= 500 or status_code in (408, 429)
+
+
+def mark_sent(results: list[DispatchResult]) -> None:
+    """Mark delivered messages sent and release their leases, in one query."""
+    if not results:
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {OutboxMessage._meta.db_table}
+            SET sent = true,
+                sent_at = now(),
+                lease_owner = '',
+                lease_expires_at = NULL
+            WHERE id = ANY(%s::uuid[])
+            """,
+            [[str(result.message_id) for result in results]],
+        )
+
+
+def mark_deferred(results: list[DispatchResult], owner: str) -> None:
+    """
+    Reschedule deferred messages and release their leases, in one query.
+    Their attempts aren't counted: no request was made. Messages no longer
+    leased to `owner` are left to the worker that claimed them since.
+    """
+    if not results:
+        return
+
+    table = OutboxMessage._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {table} AS m
+            SET next_attempt_at = now() + make_interval(secs => f.defer_seconds),
+                lease_owner = '',
+                lease_expires_at = NULL
+            FROM unnest(%s::uuid[], %s::float8[]) AS f(id, defer_seconds)
+            WHERE m.id = f.id AND m.lease_owner = %s
+            """,
+            [
+                [str(result.message_id) for result in results],
+                [result.defer_seconds for result in results],
+                owner,
+            ],
+        )
+        warn_lost_leases(len(results) - cursor.rowcount, owner)
+
+
+def mark_failed(
+        results: list[DispatchResult],
+        owner: str,
+        max_attempts: int = settings.OUTBOX_MAX_ATTEMPTS,
+        backoff_seconds: int = settings.OUTBOX_BACKOFF_SECONDS,
+        max_backoff_seconds: int = settings.OUTBOX_MAX_BACKOFF_SECONDS,
+    ) -> None:
+    """
+    Record failed sends and release their leases, in one query.
+
+    A message is retried after `backoff_seconds`, doubled with every
+    attempt up to `max_backoff_seconds`. After `max_attempts`, or right
+    away when the failure isn't retryable, it is dead-lettered. Messages
+    no longer leased to `owner` are left to the worker that claimed them
+    since, so a late result doesn't count an attempt or end its lease.
+    """
+    if not results:
+        return
+
+    table = OutboxMessage._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {table} AS m
+            SET attempts = m.attempts + 1,
+                last_error = f.error,
+                dead_letter = NOT f.retryable OR m.attempts + 1 >= %s,
+                next_attempt_at = now() + make_interval(
+                    secs => least(%s * power(2, m.attempts), %s)
+                ),
+                lease_owner = '',
+                lease_expires_at = NULL
+            FROM unnest(%s::uuid[], %s::text[], %s::boolean[])
+                AS f(id, error, retryable)
+            WHERE m.id = f.id AND m.lease_owner = %s
+            """,
+            [
+                max_attempts,
+                backoff_seconds,
+                max_backoff_seconds,
+                [str(result.message_id) for result in results],
+                [result.error for result in results],
+                [result.retryable for result in results],
+                owner,
+            ],
+        )
+        warn_lost_leases(len(results) - cursor.rowcount, owner)
+
+
+def warn_lost_leases(lost: int, owner: str) -> None:
+    if lost:
+        logger.warning(
+            f"Outbox worker {owner} lost the lease of {lost} messages, "
+            f"their results were dropped"
+        )
+
+
 def make_notification_request(
-    client: EventApiClient, payload: dict, timeout: int = 10
+    client: EventApiClient,
+    payload: dict,
+    timeout: int = NOTIFICATION_TIMEOUT,
+    stats: OutboxStats | None = None,
 ) -> None:
-    resp = client.post(
-        settings.NOTIFICATIONS_API_URL,
-        json=payload,
-        timeout=timeout
-    )
-    print(f"{resp = }")
+    started = time.perf_counter()
+    try:
+        resp = client.post(
+            settings.NOTIFICATIONS_API_URL,
+            json=payload,
+            timeout=timeout
+        )
+    finally:
+        if stats is not None:
+            stats.observe_latency(time.perf_counter() - started)
+    logger.debug(f"Notification {payload['id']}: {resp.status_code}")
+    resp.raise_for_status()
+
+
+def make_batch_notification_request(
+    client: EventApiClient,
+    url: str,
+    notifications: list[dict],
+    timeout: int = BATCH_NOTIFICATION_TIMEOUT,
+    stats: OutboxStats | None = None,
+) -> Response:
+    started = time.perf_counter()
+    try:
+        resp = client.post(
+            url,
+            json={"notifications": notifications},
+            timeout=timeout
+        )
+    finally:
+        if stats is not None:
+            stats.observe_latency(time.perf_counter() - started)
+    logger.debug(f"Notification batch of {len(notifications)}: {resp.status_code}")
     resp.raise_for_status()
+    return resp
+
+
+def archive_outbox(
+        before: datetime,
+        chunk_size: int = settings.OUTBOX_ARCHIVE_CHUNK_SIZE,
+    ) -> int:
+    """
+    Move messages sent before `before` to `OutboxMessageArchive`, returning
+    how many were moved.
+
+    Every chunk is moved by one statement (`DELETE ... RETURNING` feeding
+    an `INSERT`) in its own transaction, so locks stay short and the
+    worker's table stays small. A message already in the archive is
+    overwritten, so no deleted message is lost.
+    """
+    table = OutboxMessage._meta.db_table
+    archive_table = OutboxMessageArchive._meta.db_table
+    moved = 0
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {table}
+                    WHERE id IN (
+                        SELECT id FROM {table}
+                        WHERE sent AND sent_at < %s
+                        LIMIT %s
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING id, topic, payload, sent_at, attempts, created_at
+                )
+                INSERT INTO {archive_table}
+                    (id, topic, payload, sent_at, attempts, created_at, archived_at)
+                SELECT id, topic, payload, sent_at, attempts, created_at, now()
+                FROM moved
+                ON CONFLICT (id) DO UPDATE SET
+                    topic = EXCLUDED.topic,
+                    payload = EXCLUDED.payload,
+                    sent_at = EXCLUDED.sent_at,
+                    attempts = EXCLUDED.attempts,
+                    created_at = EXCLUDED.created_at,
+                    archived_at = EXCLUDED.archived_at
+                """,
+                [before, chunk_size],
+            )
+            chunk = cursor.rowcount
+
+        moved += chunk
+        logger.info(f"Archived {chunk} outbox messages")
+        if chunk < chunk_size:
+            return moved
@@ -1,3 +1,59 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import SyncLog, SyncShard
+
+STATS_FIELDS = (
+    "events_count",
+    "bytes_downloaded",
+    "retries_count",
+    "fetch_seconds",
+    "decode_seconds",
+    "venue_seconds",
+    "write_seconds",
+)
+
+
+class ReadOnlyAdminMixin:
+    """Sync records are written by the sync only."""
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+class SyncShardInline(ReadOnlyAdminMixin, admin.TabularInline):
+    model = SyncShard
+    fields = (
+        "changed_from",
+        "changed_before",
+        "status",
+        "worker",
+        "created_count",
+        "updated_count",
+        "failed_count",
+        *STATS_FIELDS,
+        "error",
+    )
+    extra = 0
+
+
+@admin.register(SyncLog)
+class SyncLogAdmin(ReadOnlyAdminMixin, admin.ModelAdmin):
+    list_display = (
+        "started_at",
+        "status",
+        "duration",
+        "events_per_second",
+        "created_count",
+        "updated_count",
+        "failed_count",
+        *STATS_FIELDS,
+    )
+    list_filter = ("status",)
+    date_hierarchy = "started_at"
+    inlines = (SyncShardInline,)
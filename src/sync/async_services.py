@@ -0,0 +1,149 @@
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from httpx import HTTPStatusError, RequestError
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
+
+from core.http_clients import AsyncEventApiClient
+
+from .cache import VenueCache
+from .decoding import decode_events
+from .models import SyncLog
+from .services import (
+    create_event_batch,
+    get_batch_watermark,
+    get_high_watermark,
+    get_window_start,
+    split_windows,
+    upsert_event_batch,
+    window_url,
+)
+from .stats import SyncStats, count_retry
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+async def async_sync_events(
+        provider_url: str = settings.EVENT_PROVIDER_API_URL,
+        from_date: date | None = None,
+        sync_all: bool = False,
+        bulk: bool = False,
+        concurrency: int = settings.SYNC_CONCURRENCY,
+        window: timedelta = timedelta(days=settings.SYNC_WINDOW_DAYS),
+        venue_cache: VenueCache | None = None,
+    ) -> SyncLog:
+    """
+    Concurrent counterpart of `sync_events`.
+
+    The `changed_at` range is split into windows whose page chains are
+    fetched concurrently, at most `concurrency` requests at a time. Pages
+    go through a bounded queue to a single writer running the regular
+    batch writers in Django's sync thread.
+
+    Windows complete out of order, so these runs can't be resumed.
+    """
+    watermark = await sync_to_async(get_high_watermark)()
+    since = get_window_start(from_date, sync_all, watermark)
+    windows = split_windows(since, timezone.now(), window)
+    sync_log = await sync_to_async(SyncLog.objects.create)(
+        start_url=window_url(provider_url, *windows[0]),
+        high_watermark=watermark,
+    )
+
+    write_batch = upsert_event_batch if bulk else create_event_batch
+    if venue_cache is None:
+        venue_cache = VenueCache()
+
+    stats = SyncStats()
+
+    def write_page(url: str, items: list[dict]) -> None:
+        with stats.timing("decode"):
+            events, invalid = decode_events(items)
+        with stats.timing("write", exclude="venue"):
+            created, updated, failed = write_batch(events, venue_cache, stats=stats)
+        failed += invalid
+        stats.events_count += len(items)
+        sync_log.record_page(
+            None, created, updated, failed,
+            watermark=get_batch_watermark(events),
+            stats=stats,
+        )
+        logger.info(
+            f"Synced batch ({url=}): "
+            f"{created} created, {updated} updated, {failed} failed"
+        )
+
+    pages: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with AsyncEventApiClient() as client:
+        async def fetch_window(start: datetime | None, end: datetime) -> None:
+            url = window_url(provider_url, start, end)
+            while url:
+                async with semaphore:
+                    next_url, events = await async_fetch_event_batch(
+                        url, client, stats=stats
+                    )
+                await pages.put((url, events))
+                url = next_url
+
+        async def fetch_all() -> None:
+            async with asyncio.TaskGroup() as fetchers:
+                for start, end in windows:
+                    fetchers.create_task(fetch_window(start, end))
+            await pages.put(_DONE)
+
+        async def write_all() -> None:
+            while (page := await pages.get()) is not _DONE:
+                await sync_to_async(write_page)(*page)
+
+        try:
+            async with asyncio.TaskGroup() as tasks:
+                tasks.create_task(fetch_all())
+                tasks.create_task(write_all())
+        except BaseException as e:
+            logger.exception("Concurrent sync failed")
+            await sync_to_async(sync_log.finish)(
+                SyncLog.Status.FAILED, error=f"{type(e).__name__}: {e}", stats=stats
+            )
+            raise
+
+    await sync_to_async(sync_log.finish)(SyncLog.Status.SUCCEEDED, stats=stats)
+    return sync_log
+
+
+@retry(
+    stop=stop_after_attempt(5),
+    wait=wait_exponential(multiplier=1, min=1, max=10),
+    retry=retry_if_exception_type((RequestError, HTTPStatusError)),
+    before_sleep=count_retry,
+)
+async def async_fetch_event_batch(
+        batch_url: str, client: AsyncEventApiClient, stats: SyncStats | None = None
+    ) -> tuple[str, list[dict]]:
+    if stats is None:
+        stats = SyncStats()
+
+    try:
+        # Concurrent requests add up, see `SyncStats`
+        with stats.timing("fetch"):
+            resp = await client.get(batch_url, timeout=30)
+        resp.raise_for_status()
+    except (HTTPStatusError, RequestError) as e:
+        logger.warning(f"Unable to fetch events from url={batch_url}: {e}")
+        raise
+
+    stats.bytes_downloaded += len(resp.content)
+    resp_json = resp.json()
+    return resp_json["next"], resp_json["results"]
@@ -0,0 +1,99 @@
+import sys
+from collections.abc import Callable
+from dataclasses import dataclass
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connection
+
+from core.http_clients import EventApiClient
+
+from .fake_provider import FakeProvider
+from .models import SyncLog
+from .services import sync_events
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+@dataclass
+class BenchmarkResult:
+    scenario: str
+    sync_log: SyncLog
+    seconds: float
+    queries: int
+    peak_rss_mb: float | None
+
+    @property
+    def events_per_second(self) -> float:
+        return self.sync_log.events_count / self.seconds if self.seconds else 0.0
+
+    @property
+    def queries_per_event(self) -> float:
+        events = self.sync_log.events_count
+        return self.queries / events if events else 0.0
+
+
+class QueryCounter:
+    """`connection.execute_wrapper` counting the queries it lets through."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run_benchmark(
+        provider: FakeProvider,
+        change_ratio: float = 0.05,
+        warm_runs: int = 3,
+        bulk: bool = False,
+        prefetch_batches: int = settings.SYNC_PREFETCH_BATCHES,
+    ) -> list[BenchmarkResult]:
+    """
+    Run `sync_events` against `provider`: a cold full sync into the current
+    (empty) database, then `warm_runs` incremental syncs, each after
+    `change_ratio` of the provider's events changed.
+    """
+    results = []
+    with provider.client(EventApiClient) as client:
+        def sync(**kwargs) -> SyncLog:
+            return sync_events(
+                bulk=bulk, prefetch_batches=prefetch_batches, client=client, **kwargs
+            )
+
+        results.append(measure("cold full", lambda: sync(sync_all=True)))
+        for _ in range(warm_runs):
+            changed = provider.change(change_ratio)
+            results.append(measure(f"warm, {changed} changed", sync))
+
+    return results
+
+
+def measure(scenario: str, run: Callable[[], SyncLog]) -> BenchmarkResult:
+    counter = QueryCounter()
+    started = perf_counter()
+    with connection.execute_wrapper(counter):
+        sync_log = run()
+
+    return BenchmarkResult(
+        scenario=scenario,
+        sync_log=sync_log,
+        seconds=perf_counter() - started,
+        queries=counter.count,
+        peak_rss_mb=get_peak_rss_mb(),
+    )
+
+
+def get_peak_rss_mb() -> float | None:
+    """Peak resident memory of this process so far."""
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
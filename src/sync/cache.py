@@ -0,0 +1,47 @@
+from collections import OrderedDict
+from uuid import UUID
+
+from django.conf import settings
+
+from events.models import Venue
+
+
+class VenueCache:
+    """
+    Least-recently-used map of provider venue ids to local venues.
+
+    Holds at most `maxsize` venues, so a single instance can be kept for
+    the lifetime of a long-running sync process.
+    """
+
+    def __init__(self, maxsize: int = settings.SYNC_VENUE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._venues: OrderedDict[UUID, Venue] = OrderedDict()
+
+    def __contains__(self, provider_id: UUID) -> bool:
+        return provider_id in self._venues
+
+    def __getitem__(self, provider_id: UUID) -> Venue:
+        venue = self._venues[provider_id]
+        self._venues.move_to_end(provider_id)
+        return venue
+
+    def __setitem__(self, provider_id: UUID, venue: Venue) -> None:
+        self._venues[provider_id] = venue
+        self._venues.move_to_end(provider_id)
+        while len(self._venues) > self.maxsize:
+            self._venues.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._venues)
+
+    def get(self, provider_id: UUID, default: Venue | None = None) -> Venue | None:
+        if provider_id not in self._venues:
+            return default
+        return self[provider_id]
+
+    def discard(self, provider_id: UUID) -> None:
+        self._venues.pop(provider_id, None)
+
+    def clear(self) -> None:
+        self._venues.clear()
@@ -0,0 +1,165 @@
+import logging
+import signal
+import threading
+from datetime import date
+
+from django.conf import settings
+from django.db import DatabaseError, InterfaceError, connection
+from httpx import HTTPError
+
+from core.http_clients import EventApiClient, get_api_client
+
+from .cache import VenueCache
+from .exceptions import SyncAlreadyRunningError
+from .locks import try_advisory_lock
+from .services import build_start_url, get_high_watermark, sync_events
+
+logger = logging.getLogger(__name__)
+
+
+class SyncDaemon:
+    """
+    Keeps local events in sync by polling the provider.
+
+    The shared client and one venue cache serve every run. Before each
+    incremental run the start page is probed with the validators
+    (`ETag`, `Last-Modified`) the provider sent for it, so an idle poll
+    costs a 304. The polling interval starts at `min_interval`, doubles
+    after every poll that brought no change up to `max_interval`, and
+    drops back as soon as something changes.
+
+    `lock_id` is the advisory lock the caller holds for the run. It lives
+    in the database session, so the connection is only replaced when it is
+    broken, and the lock is then taken again.
+    """
+
+    def __init__(
+            self,
+            provider_url: str = settings.EVENT_PROVIDER_API_URL,
+            bulk: bool = False,
+            prefetch_batches: int = settings.SYNC_PREFETCH_BATCHES,
+            min_interval: float = settings.SYNC_DAEMON_MIN_INTERVAL,
+            max_interval: float = settings.SYNC_DAEMON_MAX_INTERVAL,
+            client: EventApiClient | None = None,
+            lock_id: int | None = None,
+        ):
+        self.provider_url = provider_url
+        self.bulk = bulk
+        self.prefetch_batches = prefetch_batches
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.lock_id = lock_id
+        # The session holding `lock_id`
+        self.session = connection.connection
+
+        self.client = client or get_api_client()
+        self.venue_cache = VenueCache()
+        # Start url -> conditional request headers for it
+        self.validators: dict[str, dict[str, str]] = {}
+        self.stopping = threading.Event()
+
+    def run(self, from_date: date | None = None, sync_all: bool = False) -> None:
+        """
+        Poll until `stop` is called or SIGTERM/SIGINT is received. The first
+        run starts at `from_date` or syncs all, like the one-shot command.
+        """
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *args: self.stop())
+
+        changed = self.sync(from_date=from_date, sync_all=sync_all)
+        while not self.stopping.wait(self.next_interval(changed)):
+            changed = self.poll()
+
+        logger.info("Sync daemon stopped")
+
+    def stop(self) -> None:
+        """Stop after the current run."""
+        logger.info("Sync daemon stopping")
+        self.stopping.set()
+
+    def poll(self) -> bool:
+        """
+        Sync changes since the watermark unless the provider has none. A
+        failed probe counts as no change, so the next poll is backed off.
+        """
+        try:
+            self.ensure_connection()
+            url = build_start_url(self.provider_url, None, False, get_high_watermark())
+            if not self.has_changes(url):
+                return False
+        except HTTPError as e:
+            logger.warning(f"Sync daemon probe failed: {e}")
+            return False
+        except (DatabaseError, InterfaceError) as e:
+            logger.warning(f"Sync daemon database error: {e}")
+            return False
+
+        return self.sync()
+
+    def ensure_connection(self) -> None:
+        """
+        Replace a connection broken e.g. by a database restart. The run lock
+        went with its session: if another run took it meanwhile, raise
+        `SyncAlreadyRunningError`.
+        """
+        if connection.connection is not None and not connection.is_usable():
+            logger.warning("Sync daemon database connection broken, reconnecting")
+            connection.close()
+
+        if self.lock_id is None or (
+            connection.connection is not None
+            and connection.connection is self.session
+        ):
+            return
+
+        connection.ensure_connection()
+        if not try_advisory_lock(self.lock_id):
+            raise SyncAlreadyRunningError()
+        self.session = connection.connection
+        logger.info("Sync daemon took the run lock again")
+
+    def has_changes(self, url: str) -> bool:
+        """Conditional request for the start page, remembering its validators."""
+        with self.client.stream(
+            "GET", url, headers=self.validators.get(url, {}), timeout=30
+        ) as resp:
+            if resp.status_code == 304:
+                return False
+            resp.raise_for_status()
+
+        validators = {}
+        if etag := resp.headers.get("ETag"):
+            validators["If-None-Match"] = etag
+        if last_modified := resp.headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = last_modified
+        # The watermark moved on, older start urls won't be asked again
+        self.validators = {url: validators} if validators else {}
+        return True
+
+    def sync(self, from_date: date | None = None, sync_all: bool = False) -> bool:
+        """Run one sync, returning whether it changed anything."""
+        try:
+            sync_log = sync_events(
+                self.provider_url,
+                from_date=from_date,
+                sync_all=sync_all,
+                bulk=self.bulk,
+                prefetch_batches=self.prefetch_batches,
+                venue_cache=self.venue_cache,
+                client=self.client,
+            )
+        except Exception:
+            logger.exception("Sync daemon run failed")
+            return False
+
+        logger.info(f"Sync daemon: {sync_log}")
+        return bool(sync_log.created_count or sync_log.updated_count)
+
+    def next_interval(self, changed: bool) -> float:
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * 2, self.max_interval)
+        return self.interval
+
@@ -0,0 +1,257 @@
+import codecs
+import json
+import logging
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from functools import lru_cache
+from hashlib import blake2b
+from json.encoder import encode_basestring
+from typing import Any
+from uuid import UUID
+
+from events.models import Event
+
+from .exceptions import InvalidEventError
+
+logger = logging.getLogger(__name__)
+
+EVENT_STATUSES = frozenset(Event.Status.values)
+
+
+# Not frozen: frozen dataclasses set each field through object.__setattr__,
+# which is most of the cost of building one
+@dataclass(slots=True)
+class ProviderEvent:
+    """A validated provider event, as consumed by the batch writers."""
+
+    provider_id: UUID
+    name: str
+    event_time: datetime
+    registration_deadline: datetime
+    status: str
+    venue_id: UUID
+    venue_name: str
+    changed_at: datetime | None
+    payload_hash: str
+    venue_hash: str
+
+    @classmethod
+    def from_payload(cls, data: Any) -> "ProviderEvent":
+        try:
+            place = data["place"]
+            name = _str(data, "name")
+            status = _str(data, "status")
+            if status not in EVENT_STATUSES:
+                raise InvalidEventError(f"Unknown status {status!r}")
+
+            venue_name = _str(place, "name")
+            venue_id, venue_hash = _venue(_str(place, "id"), venue_name)
+            changed_at = data.get("changed_at")
+
+            return cls(
+                provider_id=UUID(_str(data, "id")),
+                name=name,
+                event_time=_datetime(data, "event_time"),
+                registration_deadline=_datetime(data, "registration_deadline"),
+                status=status,
+                venue_id=venue_id,
+                venue_name=venue_name,
+                changed_at=_datetime(data, "changed_at") if changed_at else None,
+                payload_hash=event_payload_hash(data),
+                venue_hash=venue_hash,
+            )
+        except InvalidEventError:
+            raise
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            raise InvalidEventError(f"Invalid event payload: {e!r}") from e
+
+
+@lru_cache(maxsize=4096)
+def _venue(venue_id: str, venue_name: str) -> tuple[UUID, str]:
+    """Parsed id and payload hash of a venue, which many events share."""
+    return UUID(venue_id), hash_payload(venue_name)
+
+
+def decode_events(items: Iterable[Any]) -> tuple[list[ProviderEvent], int]:
+    """Decode already parsed payloads, returning records and the invalid count."""
+    events, invalid = [], 0
+    for item in items:
+        try:
+            events.append(ProviderEvent.from_payload(item))
+        except InvalidEventError as e:
+            logger.error(str(e))
+            invalid += 1
+
+    return events, invalid
+
+
+def _str(data: dict, key: str) -> str:
+    value = data[key]
+    if not isinstance(value, str):
+        raise InvalidEventError(f"{key} must be a string, got {value!r}")
+    return value
+
+
+def _datetime(data: dict, key: str) -> datetime:
+    value = datetime.fromisoformat(_str(data, key))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return value
+
+
+def hash_payload(*values: str) -> str:
+    """
+    Compact digest of provider values, stored to skip unchanged rows.
+
+    The digested text is the same as `json.dumps(values, separators=(",",
+    ":"), ensure_ascii=False)`, built without an encoder per call.
+    """
+    encoded = "[" + ",".join(map(encode_basestring, values)) + "]"
+    return blake2b(encoded.encode(), digest_size=16).hexdigest()
+
+
+def event_payload_hash(event_data: dict) -> str:
+    return hash_payload(
+        event_data["name"],
+        event_data["event_time"],
+        event_data["registration_deadline"],
+        event_data["status"],
+        event_data["place"]["id"],
+    )
+
+
+def venue_payload_hash(venue_data: dict) -> str:
+    return hash_payload(venue_data["name"])
+
+
+class JsonPageReader:
+    """
+    Incremental reader of a JSON object holding one large array.
+
+    Iterating yields the items of the `array_key` array one at a time while
+    the body is still arriving, so only the current item and two chunks are
+    held in memory. The other top-level keys are collected in `fields`.
+    A body that arrives in a single chunk is parsed with `json.loads`,
+    which is several times faster than scanning it item by item.
+    """
+
+    WHITESPACE = re.compile(r"[ \t\n\r]*")
+    NUMBER_TAIL = re.compile(r"[0-9+\-.eE]*\Z")
+
+    def __init__(self, chunks: Iterable[bytes], array_key: str = "results"):
+        self.array_key = array_key
+        self.fields: dict[str, Any] = {}
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def __iter__(self) -> Iterator[Any]:
+        # Reading a second chunk tells whether the first one was the body
+        self._fill()
+        if not self._eof:
+            self._fill()
+        if self._eof:
+            yield from self._loads()
+            return
+
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                raise TypeError(f"Expected an object key, got {key!r}")
+            self._expect(":")
+
+            if key == self.array_key:
+                yield from self._array()
+            else:
+                self.fields[key] = self._value()
+
+            if self._token(",}") == "}":
+                return
+
+    def _loads(self) -> list[Any]:
+        document = json.loads(self._buffer)
+        self._buffer = ""
+        if not isinstance(document, dict):
+            raise TypeError(f"Expected an object, got {type(document).__name__}")
+
+        items = document.pop(self.array_key, [])
+        if not isinstance(items, list):
+            raise TypeError(f"Expected an array, got {type(items).__name__}")
+        self.fields = document
+        return items
+
+    def _array(self) -> Iterator[Any]:
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+
+        while True:
+            yield self._value()
+            if self._token(",]") == "]":
+                return
+
+    def _value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+                self._fill()
+                continue
+
+            # A number cut at the buffer end may continue, e.g. "-3."
+            # decodes as -3 until the next chunk brings "5"
+            if (
+                not self._eof
+                and isinstance(value, int | float)
+                and self.NUMBER_TAIL.match(self._buffer, end)
+            ):
+                self._fill()
+                continue
+
+            self._pos = end
+            return value
+
+    def _expect(self, char: str) -> None:
+        self._token(char)
+
+    def _token(self, allowed: str) -> str:
+        char = self._peek()
+        if char not in allowed:
+            raise ValueError(f"Expected one of {allowed!r}, got {char!r}")
+        self._pos += 1
+        return char
+
+    def _peek(self) -> str:
+        while True:
+            self._pos = self.WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if self._eof:
+                raise ValueError("Unexpected end of JSON document")
+            self._fill()
+
+    def _fill(self) -> None:
+        # Drop what has been consumed before appending the next chunk
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            self._buffer += self._text.decode(b"", final=True)
+        else:
+            self._buffer += self._text.decode(chunk)
@@ -0,0 +1,41 @@
+class SyncError(Exception):
+    """Base exception for event synchronization errors."""
+
+
+class NothingToResumeError(SyncError):
+    """Raised when there is no interrupted sync run to resume."""
+
+    def __init__(self, message="No interrupted sync run to resume."):
+        super().__init__(message)
+
+
+class NoSyncStartError(SyncError):
+    """Raised when a concurrent sync has no changed_at to start from."""
+
+    def __init__(self, message="No sync watermark yet: pass a date or sync all."):
+        super().__init__(message)
+
+
+class NothingToJoinError(SyncError):
+    """Raised when there is no running sharded sync to join."""
+
+    def __init__(self, message="No running sharded sync to join."):
+        super().__init__(message)
+
+
+class SyncAlreadyRunningError(SyncError):
+    """Raised when another sync run holds the sync lock."""
+
+    def __init__(self, message="Another sync is already running."):
+        super().__init__(message)
+
+
+class InvalidEventError(SyncError):
+    """Raised when a provider event fails validation."""
+
+
+class CannotReconcileError(SyncError):
+    """Raised when reconciliation is asked for a run that isn't a full sync."""
+
+    def __init__(self, message="Only a new full sync can be reconciled."):
+        super().__init__(message)
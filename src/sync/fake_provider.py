@@ -0,0 +1,132 @@
+import json
+import random
+import time
+from datetime import UTC, datetime, timedelta
+from hashlib import blake2b
+from urllib.parse import urlencode
+from uuid import UUID
+
+import httpx
+from django.conf import settings
+
+from events.models import Event
+
+# Provider ids of fake venues start here, fake events start at 1
+VENUE_ID_OFFSET = 10**9
+
+
+class FakeProvider:
+    """
+    In-process stand-in for the event provider, served through
+    `httpx.MockTransport`.
+
+    Serves `events` events spread over `venues` venues in pages of
+    `page_size`, following the provider's format: `{"next": ..., "results":
+    [...]}` with an opaque `cursor` query parameter, filtered by the
+    `changed_at` (and changed before) parameters. Each request waits
+    `latency` seconds. Pages carry an `ETag` and honour `If-None-Match`.
+    `change` touches a share of the events so the next incremental sync has
+    something to do.
+    """
+
+    def __init__(
+            self,
+            events: int = 10_000,
+            venues: int = 100,
+            page_size: int = 100,
+            latency: float = 0.0,
+            seed: int = 0,
+            base_url: str = "http://provider.test/events/",
+        ):
+        self.page_size = page_size
+        self.latency = latency
+        self.base_url = base_url
+        self.requests_count = 0
+        self.not_modified_count = 0
+        self._random = random.Random(seed)
+
+        # Events changed one minute apart, the last one a minute ago
+        self._clock = datetime.now(UTC).replace(microsecond=0)
+        first_change = self._clock - timedelta(minutes=events)
+        self._events = [
+            self._event(number, venues, first_change + timedelta(minutes=number))
+            for number in range(events)
+        ]
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def client(self, client_class: type[httpx.Client] = httpx.Client) -> httpx.Client:
+        return client_class(transport=self.transport())
+
+    def change(self, ratio: float) -> int:
+        """Rename a random `ratio` of the events, returning how many."""
+        self._clock += timedelta(minutes=1)
+        changed = self._random.sample(
+            range(len(self._events)), round(len(self._events) * ratio)
+        )
+        for number in changed:
+            event = self._events[number]
+            event["name"] = f"{event['name'].split(' #')[0]} #{self._clock:%H%M}"
+            event["changed_at"] = self._clock.isoformat()
+
+        return len(changed)
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        params = request.url.params
+        events = self._events
+        if "changed_at" in params:
+            since = _parse_changed_at(params["changed_at"])
+            events = [e for e in events if _parse_changed_at(e["changed_at"]) >= since]
+        before_param = settings.EVENT_PROVIDER_CHANGED_BEFORE_PARAM
+        if before_param in params:
+            before = _parse_changed_at(params[before_param])
+            events = [e for e in events if _parse_changed_at(e["changed_at"]) < before]
+
+        offset = int(params.get("cursor", 0))
+        results = events[offset:offset + self.page_size]
+
+        next_url = None
+        if offset + self.page_size < len(events):
+            query = dict(params, cursor=str(offset + self.page_size))
+            next_url = f"{self.base_url}?{urlencode(query)}"
+
+        content = json.dumps({"next": next_url, "results": results}).encode()
+        etag = f'"{blake2b(content, digest_size=8).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified_count += 1
+            return httpx.Response(304, headers={"ETag": etag})
+
+        return httpx.Response(
+            200,
+            content=content,
+            headers={"Content-Type": "application/json", "ETag": etag},
+        )
+
+    @staticmethod
+    def _event(number: int, venues: int, changed_at: datetime) -> dict:
+        venue = number % venues
+        event_time = changed_at + timedelta(days=30)
+        return {
+            "id": str(UUID(int=number + 1)),
+            "name": f"Event {number}",
+            "event_time": event_time.isoformat(),
+            "registration_deadline": (event_time - timedelta(days=1)).isoformat(),
+            "status": Event.Status.OPEN if number % 10 else Event.Status.CLOSED,
+            "changed_at": changed_at.isoformat(),
+            "place": {
+                "id": str(UUID(int=VENUE_ID_OFFSET + venue)),
+                "name": f"Venue {venue}",
+            },
+        }
+
+
+def _parse_changed_at(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed
@@ -0,0 +1,47 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from django.db import connection
+
+# First key of Postgres advisory locks taken by the sync ("SYNC")
+SYNC_LOCK_NAMESPACE = 0x53594E43
+# Second key of the lock held by a whole sync run; shards use their pk
+SYNC_RUN_LOCK_ID = 0
+
+
+def try_advisory_lock(lock_id: int) -> bool:
+    """Take a session-level advisory lock without waiting for it."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_try_advisory_lock(%s, %s)",
+            [SYNC_LOCK_NAMESPACE, _to_int4(lock_id)],
+        )
+        return cursor.fetchone()[0]
+
+
+def advisory_unlock(lock_id: int) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_unlock(%s, %s)",
+            [SYNC_LOCK_NAMESPACE, _to_int4(lock_id)],
+        )
+
+
+@contextmanager
+def advisory_lock(lock_id: int) -> Iterator[bool]:
+    """
+    Hold an advisory lock for the block, yielding whether it was acquired.
+
+    The lock belongs to the database session, so it is also released when
+    the process dies and its connection closes.
+    """
+    acquired = try_advisory_lock(lock_id)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            advisory_unlock(lock_id)
+
+
+def _to_int4(lock_id: int) -> int:
+    return (lock_id + 2**31) % 2**32 - 2**31
@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from sync.benchmark import run_benchmark
+from sync.fake_provider import FakeProvider
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark syncevents against a fake event-provider, "
+        "in a throwaway test database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=10_000)
+        parser.add_argument("--venues", type=int, default=100)
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--change-ratio",
+                            type=float,
+                            default=0.05,
+                            help="Share of events changed before each warm sync")
+        parser.add_argument("--latency-ms",
+                            type=float,
+                            default=0,
+                            help="Delay of every provider response")
+        parser.add_argument("--warm-runs", type=int, default=3)
+        parser.add_argument("--bulk", action="store_true")
+        parser.add_argument("--prefetch",
+                            type=int,
+                            default=settings.SYNC_PREFETCH_BATCHES)
+        parser.add_argument("--keepdb",
+                            action="store_true",
+                            help="Reuse the test database (emptied by hand)")
+
+    def handle(self, *args, **options):
+        provider = FakeProvider(
+            events=options["events"],
+            venues=options["venues"],
+            page_size=options["page_size"],
+            latency=options["latency_ms"] / 1000,
+        )
+
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False, keepdb=options["keepdb"]
+        )
+        try:
+            results = run_benchmark(
+                provider,
+                change_ratio=options["change_ratio"],
+                warm_runs=options["warm_runs"],
+                bulk=options["bulk"],
+                prefetch_batches=options["prefetch"],
+            )
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+
+        self.stdout.write(
+            f"{'scenario':<24}{'events':>8}{'seconds':>9}{'events/s':>10}"
+            f"{'queries/event':>15}{'peak RSS MB':>13}"
+            f"{'fetch':>8}{'decode':>8}{'venue':>8}{'write':>8}"
+        )
+        for result in results:
+            sync_log = result.sync_log
+            rss = f"{result.peak_rss_mb:.0f}" if result.peak_rss_mb else "n/a"
+            self.stdout.write(
+                f"{result.scenario:<24}"
+                f"{sync_log.events_count:>8}"
+                f"{result.seconds:>9.2f}"
+                f"{result.events_per_second:>10.0f}"
+                f"{result.queries_per_event:>15.2f}"
+                f"{rss:>13}"
+                f"{sync_log.fetch_seconds:>8.2f}"
+                f"{sync_log.decode_seconds:>8.2f}"
+                f"{sync_log.venue_seconds:>8.2f}"
+                f"{sync_log.write_seconds:>8.2f}"
+            )
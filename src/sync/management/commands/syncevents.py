@@ -1,9 +1,16 @@
-from datetime import date
+import asyncio
+from datetime import date, timedelta
 
-from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
 
-from sync.models import SyncLog
+from sync.async_services import async_sync_events
+from sync.daemon import SyncDaemon
+from sync.exceptions import SyncAlreadyRunningError, SyncError
+from sync.locks import SYNC_RUN_LOCK_ID, advisory_lock
+from sync.reconcile import Reconcile
 from sync.services import sync_events
+from sync.sharding import create_sharded_sync, join_sharded_sync, run_sharded_sync
 
 
 class Command(BaseCommand):
@@ -14,18 +21,130 @@ class Command(BaseCommand):
         parser.add_argument("--date",
                             type=date.fromisoformat,
                             help="Sync events changed since this date (YYYY-MM-DD)")
+        parser.add_argument("--resume",
+                            action="store_true",
+                            help="Continue the last interrupted sync")
+        parser.add_argument("--bulk",
+                            action="store_true",
+                            help="Write each provider page with a set-based upsert")
+        parser.add_argument("--prefetch",
+                            type=int,
+                            default=settings.SYNC_PREFETCH_BATCHES,
+                            help="Event batches fetched ahead of the writer (0 disables)")
+        parser.add_argument("--concurrency",
+                            type=int,
+                            help="Fetch changed_at windows with N parallel requests")
+        parser.add_argument("--window-days",
+                            type=int,
+                            default=settings.SYNC_WINDOW_DAYS,
+                            help="Size of a changed_at window or shard")
+        parser.add_argument("--workers",
+                            type=int,
+                            help="Split the range into shards synced by N processes")
+        parser.add_argument("--join",
+                            action="store_true",
+                            help="Add --workers processes to the running sharded sync")
+        parser.add_argument("--daemon",
+                            action="store_true",
+                            help="Keep polling the provider until SIGTERM")
+        parser.add_argument("--reconcile",
+                            choices=[mode.value for mode in Reconcile],
+                            help="After --all, close or delete events not returned")
 
     def handle(self, *args, **options):
+        if options["resume"] and (options["all"] or options["date"]):
+            raise CommandError("--resume can't be combined with --all or --date")
+        if options["resume"] and (options["concurrency"] or options["workers"]):
+            raise CommandError("Concurrent and sharded syncs can't be resumed")
+        if options["join"] and not options["workers"]:
+            raise CommandError("--join needs --workers")
+        if options["reconcile"] and (options["concurrency"] or options["workers"]):
+            raise CommandError("Concurrent and sharded syncs can't be reconciled")
+        if options["daemon"] and any(
+            options[name]
+            for name in ("resume", "concurrency", "workers", "join", "reconcile")
+        ):
+            raise CommandError(
+                "--daemon can't be combined with --resume, --concurrency, "
+                "--workers, --join or --reconcile"
+            )
+
         self.stdout.write("Sync starting")
 
-        created, updated, failed = sync_events(
-            from_date=options["date"], sync_all=options["all"]
-        )
+        try:
+            if options["join"]:
+                # Joining workers share the run lock of the coordinator
+                sync_log = join_sharded_sync(
+                    workers=options["workers"],
+                    bulk=options["bulk"],
+                    prefetch_batches=options["prefetch"],
+                )
+            else:
+                with advisory_lock(SYNC_RUN_LOCK_ID) as acquired:
+                    if not acquired:
+                        raise SyncAlreadyRunningError()
+
+                    if options["daemon"]:
+                        self.run_daemon(options)
+                        return
 
-        SyncLog.objects.create(created_count=created, updated_count=updated)
-        self.stdout.write(
-            self.style.SUCCESS(
-                f"Sync done: "
-                f"{created} created, {updated} updated, {failed} failed"
+                    sync_log = self.sync(options)
+        except SyncError as e:
+            raise CommandError(str(e)) from e
+
+        self.write_summary(sync_log, options)
+
+    def sync(self, options):
+        window = timedelta(days=options["window_days"])
+
+        if options["workers"]:
+            sync_log = create_sharded_sync(
+                from_date=options["date"],
+                sync_all=options["all"],
+                window=window,
+            )
+            return run_sharded_sync(
+                sync_log,
+                workers=options["workers"],
+                bulk=options["bulk"],
+                prefetch_batches=options["prefetch"],
             )
-        )
\ No newline at end of file
+
+        if options["concurrency"]:
+            return asyncio.run(async_sync_events(
+                from_date=options["date"],
+                sync_all=options["all"],
+                bulk=options["bulk"],
+                concurrency=options["concurrency"],
+                window=window,
+            ))
+
+        return sync_events(
+            from_date=options["date"],
+            sync_all=options["all"],
+            bulk=options["bulk"],
+            prefetch_batches=options["prefetch"],
+            resume=options["resume"],
+            reconcile=options["reconcile"] and Reconcile(options["reconcile"]),
+        )
+
+    def run_daemon(self, options):
+        self.stdout.write("Sync daemon running, stop it with SIGTERM")
+        SyncDaemon(
+            bulk=options["bulk"],
+            prefetch_batches=options["prefetch"],
+            lock_id=SYNC_RUN_LOCK_ID,
+        ).run(from_date=options["date"], sync_all=options["all"])
+        self.stdout.write(self.style.SUCCESS("Sync daemon stopped"))
+
+    def write_summary(self, sync_log, options):
+        summary = (
+            f"Sync done: "
+            f"{sync_log.created_count} created, "
+            f"{sync_log.updated_count} updated, "
+            f"{sync_log.failed_count} failed"
+        )
+        if options["reconcile"]:
+            summary += f", {sync_log.reconciled_count} reconciled"
+
+        self.stdout.write(self.style.SUCCESS(summary))
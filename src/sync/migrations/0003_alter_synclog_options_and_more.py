@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sync", "0002_rename_added_count_synclog_created_count"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="synclog",
+            options={"ordering": ["-started_at"]},
+        ),
+        migrations.RenameField(
+            model_name="synclog",
+            old_name="ran_at",
+            new_name="started_at",
+        ),
+        migrations.AddField(
+            model_name="synclog",
+            name="cursor_url",
+            field=models.URLField(blank=True, max_length=2048),
+        ),
+        migrations.AddField(
+            model_name="synclog",
+            name="failed_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="synclog",
+            name="finished_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="synclog",
+            name="pages_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="synclog",
+            name="start_url",
+            field=models.URLField(blank=True, max_length=2048),
+        ),
+        migrations.AddField(
+            model_name="synclog",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("running", "Running"),
+                    ("succeeded", "Succeeded"),
+                    ("failed", "Failed"),
+                ],
+                default="running",
+                max_length=9,
+            ),
+        ),
+        migrations.RunSQL(
+            "UPDATE sync_synclog SET status = 'succeeded', finished_at = started_at",
+            migrations.RunSQL.noop,
+        ),
+    ]
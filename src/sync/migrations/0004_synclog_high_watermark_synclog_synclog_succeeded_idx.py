@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sync", "0003_alter_synclog_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="synclog",
+            name="high_watermark",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="synclog",
+            index=models.Index(
+                condition=models.Q(("status", "succeeded")),
+                fields=["-started_at"],
+                name="synclog_succeeded_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sync", "0004_synclog_high_watermark_synclog_synclog_succeeded_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="synclog",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("running", "Running"),
+                    ("succeeded", "Succeeded"),
+                    ("failed", "Failed"),
+                ],
+                default="running",
+                max_length=9,
+            ),
+        ),
+        migrations.CreateModel(
+            name="SyncShard",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("succeeded", "Succeeded"),
+                            ("failed", "Failed"),
+                        ],
+                        default="running",
+                        max_length=9,
+                    ),
+                ),
+                ("cursor_url", models.URLField(blank=True, max_length=2048)),
+                ("high_watermark", models.DateTimeField(blank=True, null=True)),
+                ("pages_count", models.PositiveIntegerField(default=0)),
+                ("created_count", models.PositiveIntegerField(default=0)),
+                ("updated_count", models.PositiveIntegerField(default=0)),
+                ("failed_count", models.PositiveIntegerField(default=0)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("changed_from", models.DateTimeField()),
+                ("changed_before", models.DateTimeField()),
+                ("worker", models.CharField(blank=True, max_length=255)),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "sync_log",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="shards",
+                        to="sync.synclog",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["changed_from"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("sync_log", "changed_from"),
+                        name="syncshard_unique_window",
+                    )
+                ],
+            },
+        ),
+    ]
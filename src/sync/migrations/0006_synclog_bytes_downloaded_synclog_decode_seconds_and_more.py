@@ -0,0 +1,93 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sync", "0005_alter_synclog_status_syncshard"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="synclog",
+            name="bytes_downloaded",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="synclog",
+            name="decode_seconds",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="synclog",
+            name="error",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="synclog",
+            name="events_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="synclog",
+            name="fetch_seconds",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="synclog",
+            name="retries_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="synclog",
+            name="venue_seconds",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="synclog",
+            name="write_seconds",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="syncshard",
+            name="bytes_downloaded",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="syncshard",
+            name="decode_seconds",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="syncshard",
+            name="error",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="syncshard",
+            name="events_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="syncshard",
+            name="fetch_seconds",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="syncshard",
+            name="retries_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="syncshard",
+            name="venue_seconds",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="syncshard",
+            name="write_seconds",
+            field=models.FloatField(default=0),
+        ),
+    ]
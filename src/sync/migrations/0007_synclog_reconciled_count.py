@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sync", "0006_synclog_bytes_downloaded_synclog_decode_seconds_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="synclog",
+            name="reconciled_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
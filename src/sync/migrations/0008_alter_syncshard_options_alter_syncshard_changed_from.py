@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sync", "0007_synclog_reconciled_count"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="syncshard",
+            options={
+                "ordering": [models.OrderBy(models.F("changed_from"), nulls_first=True)]
+            },
+        ),
+        migrations.AlterField(
+            model_name="syncshard",
+            name="changed_from",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
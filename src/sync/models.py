@@ -1,17 +1,171 @@
+from datetime import datetime, timedelta
+
 from django.db import models
+from django.utils import timezone
+
+from .stats import SyncStats
+
+
+class SyncProgress(models.Model):
+    """Status, checkpoint and counters shared by sync runs and their shards."""
 
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        SUCCEEDED = "succeeded", "Succeeded"
+        FAILED = "failed", "Failed"
 
-class SyncLog(models.Model):
-    ran_at = models.DateTimeField(auto_now_add=True)
+    status = models.CharField(
+        max_length=9,
+        choices=Status.choices,
+        default=Status.RUNNING
+    )
+    # Next provider page to fetch; empty once the last page is committed
+    cursor_url = models.URLField(max_length=2048, blank=True)
+    # Latest provider `changed_at` seen so far
+    high_watermark = models.DateTimeField(null=True, blank=True)
+
+    pages_count = models.PositiveIntegerField(default=0)
     created_count = models.PositiveIntegerField(default=0)
     updated_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+
+    # Totals collected by `SyncStats`
+    events_count = models.PositiveIntegerField(default=0)
+    bytes_downloaded = models.PositiveBigIntegerField(default=0)
+    retries_count = models.PositiveIntegerField(default=0)
+    fetch_seconds = models.FloatField(default=0)
+    decode_seconds = models.FloatField(default=0)
+    venue_seconds = models.FloatField(default=0)
+    write_seconds = models.FloatField(default=0)
+
+    # Why the run failed, if it did
+    error = models.TextField(blank=True)
+
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def duration(self) -> timedelta | None:
+        # `started_at` is defined by the concrete models
+        if not self.started_at or not self.finished_at:
+            return None
+        return self.finished_at - self.started_at
+
+    @property
+    def events_per_second(self) -> float | None:
+        duration = self.duration
+        if not duration:
+            return None
+        return self.events_count / duration.total_seconds()
+
+    def record_page(
+            self,
+            next_url: str | None,
+            created: int,
+            updated: int,
+            failed: int,
+            watermark: datetime | None = None,
+            page_done: bool = True,
+            stats: SyncStats | None = None,
+        ) -> None:
+        """
+        Add a committed batch to the counters. Once the last batch of a page
+        is in, checkpoint the page so a resumed run starts after it.
+        """
+        if page_done:
+            self.cursor_url = next_url or ""
+            self.pages_count += 1
+        if watermark and (
+            self.high_watermark is None or watermark > self.high_watermark
+        ):
+            self.high_watermark = watermark
+        self.created_count += created
+        self.updated_count += updated
+        self.failed_count += failed
+        update_fields = [
+            "cursor_url",
+            "high_watermark",
+            "pages_count",
+            "created_count",
+            "updated_count",
+            "failed_count",
+        ]
+        if stats is not None:
+            stats.apply(self)
+            update_fields += SyncStats.field_names()
+        self.save(update_fields=update_fields)
+
+    def finish(
+            self,
+            status: Status,
+            error: str = "",
+            stats: SyncStats | None = None,
+        ) -> None:
+        self.status = status
+        self.error = error
+        self.finished_at = timezone.now()
+        update_fields = ["status", "error", "finished_at"]
+        if stats is not None:
+            stats.apply(self)
+            update_fields += SyncStats.field_names()
+        self.save(update_fields=update_fields)
+
+
+class SyncLog(SyncProgress):
+    start_url = models.URLField(max_length=2048, blank=True)
+    # Local events closed or deleted as missing from the provider
+    reconciled_count = models.PositiveIntegerField(default=0)
+
+    started_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return (
+            f"Sync at {self.started_at} ({self.status}): "
+            f"{self.created_count} created, "
+            f"{self.updated_count} updated, "
+            f"{self.failed_count} failed"
+        )
+
+    class Meta:
+        ordering = ["-started_at"]
+        indexes = [
+            # Watermark lookup: latest succeeded run
+            models.Index(
+                fields=["-started_at"],
+                condition=models.Q(status="succeeded"),
+                name="synclog_succeeded_idx",
+            ),
+        ]
+
+
+class SyncShard(SyncProgress):
+    """A `changed_at` window of a sharded run, synced by one worker at a time."""
+
+    sync_log = models.ForeignKey(
+        SyncLog, on_delete=models.CASCADE, related_name="shards"
+    )
+    # Null for the open first window of a full sync
+    changed_from = models.DateTimeField(null=True, blank=True)
+    changed_before = models.DateTimeField()
+
+    # host:pid of the worker that last claimed the shard
+    worker = models.CharField(max_length=255, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return (
-            f"Sync at {self.ran_at}:"
-            f"{self.created_count} created,"
-            f"{self.updated_count} updated"
+            f"Shard {self.changed_from} - {self.changed_before} "
+            f"of sync {self.sync_log_id} ({self.status})"
         )
-    
+
     class Meta:
-        ordering = ["-ran_at"]
+        ordering = [models.F("changed_from").asc(nulls_first=True)]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["sync_log", "changed_from"],
+                name="syncshard_unique_window",
+            ),
+        ]
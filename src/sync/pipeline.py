@@ -0,0 +1,50 @@
+import queue
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+_DONE = object()
+
+
+def prefetch[T](items: Iterator[T], depth: int, name: str = "prefetch") -> Iterator[T]:
+    """
+    Consume `items` in a background thread, keeping up to `depth` of them
+    ready in a bounded queue.
+
+    The producer blocks once the queue is full (backpressure). An exception
+    raised by the producer is re-raised in the consumer, and a consumer that
+    stops early (break, exception, close) stops the producer before returning.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        finally:
+            # Also after an error, which the consumer gets from the future
+            put(_DONE)
+            close = getattr(items, "close", None)
+            if close is not None:
+                close()
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+    producer = executor.submit(produce)
+    try:
+        while (item := buffer.get()) is not _DONE:
+            yield item
+        producer.result()
+    finally:
+        stop.set()
+        executor.shutdown()
@@ -0,0 +1,17 @@
+"""
+Entry point of sync worker processes.
+
+Kept free of model imports: spawned processes unpickle the target before
+Django is set up.
+"""
+import django
+
+
+def run_shard_worker_process(
+        sync_log_id: int, bulk: bool, prefetch_batches: int
+    ) -> None:
+    django.setup()
+
+    from .sharding import run_shard_worker
+
+    run_shard_worker(sync_log_id, bulk, prefetch_batches)
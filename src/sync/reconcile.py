@@ -0,0 +1,113 @@
+import logging
+from enum import StrEnum
+from typing import Self
+
+from django.db import connection, transaction
+
+from events.models import Event, EventRegistration
+
+from .decoding import ProviderEvent
+from .models import SyncLog
+
+logger = logging.getLogger(__name__)
+
+
+class Reconcile(StrEnum):
+    """What a full sync does to local events the provider no longer has."""
+
+    CLOSE = "close"
+    DELETE = "delete"
+
+
+class SeenEvents:
+    """
+    Provider ids seen by a run, collected in a temporary table of the
+    database session so missing events can be found with one anti-join.
+
+    A payload that failed to decode may belong to a local event, so any
+    invalid payload makes the set incomplete.
+    """
+
+    table = "sync_seen_events"
+
+    def __init__(self):
+        self.count = 0
+        self.complete = True
+
+    def __enter__(self) -> Self:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {self.table} (provider_id uuid PRIMARY KEY)"
+            )
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def add(self, events: list[ProviderEvent], invalid: int = 0) -> None:
+        if invalid:
+            self.complete = False
+        if not events:
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {self.table} (provider_id) "
+                f"SELECT unnest(%s::uuid[]) ON CONFLICT DO NOTHING",
+                [[str(event.provider_id) for event in events]],
+            )
+            self.count += cursor.rowcount
+
+
+def reconcile_events(sync_log: SyncLog, seen: SeenEvents, mode: Reconcile) -> int:
+    """
+    Close or delete local provider events missing from `seen`, returning
+    how many were reconciled. Nothing is done when `seen` is incomplete
+    or empty, so a provider outage can't wipe the local events.
+    """
+    if not seen.complete:
+        logger.warning("Skipping reconciliation: some provider events were invalid")
+        return 0
+    if not seen.count:
+        logger.warning("Skipping reconciliation: the provider returned no events")
+        return 0
+
+    event_table = connection.ops.quote_name(Event._meta.db_table)
+    registration_table = connection.ops.quote_name(
+        EventRegistration._meta.db_table
+    )
+    missing = (
+        f"e.provider_id IS NOT NULL AND NOT EXISTS ("
+        f"SELECT 1 FROM {seen.table} s WHERE s.provider_id = e.provider_id)"
+    )
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Temporary tables are never analyzed automatically
+        cursor.execute(f"ANALYZE {seen.table}")
+
+        if mode == Reconcile.CLOSE:
+            # Clearing the hash makes the event rewritten if it comes back
+            cursor.execute(
+                f"UPDATE {event_table} e "
+                f"SET status = %s, payload_hash = '', updated_at = now() "
+                f"WHERE e.status <> %s AND {missing}",
+                [Event.Status.CLOSED, Event.Status.CLOSED],
+            )
+        else:
+            # Registrations go first: Django cascades in Python, not in the
+            # schema, and the foreign key is checked at commit
+            cursor.execute(
+                f"WITH gone AS (SELECT e.id FROM {event_table} e WHERE {missing}), "
+                f"registrations AS ("
+                f"DELETE FROM {registration_table} r USING gone "
+                f"WHERE r.event_id = gone.id) "
+                f"DELETE FROM {event_table} e USING gone WHERE e.id = gone.id"
+            )
+        reconciled = cursor.rowcount
+
+    sync_log.reconciled_count = reconciled
+    sync_log.save(update_fields=["reconciled_count"])
+    logger.info(f"Reconciliation ({mode}): {reconciled} missing events")
+    return reconciled
@@ -0,0 +1,31 @@
+from rest_framework import serializers
+
+from .models import SyncLog
+
+
+class SyncLogSerializer(serializers.ModelSerializer):
+    duration_seconds = serializers.SerializerMethodField()
+    events_per_second = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = SyncLog
+        fields = "__all__"
+
+    def get_duration_seconds(self, sync_log: SyncLog) -> float | None:
+        duration = sync_log.duration
+        return duration.total_seconds() if duration else None
+
+
+class SyncTrendSerializer(serializers.Serializer):
+    day = serializers.DateField()
+    runs = serializers.IntegerField()
+    failed_runs = serializers.IntegerField()
+    events_count = serializers.IntegerField()
+    failed_count = serializers.IntegerField()
+    events_per_second = serializers.FloatField(allow_null=True)
+    bytes_downloaded = serializers.IntegerField()
+    retries_count = serializers.IntegerField()
+    fetch_seconds = serializers.FloatField()
+    decode_seconds = serializers.FloatField()
+    venue_seconds = serializers.FloatField()
+    write_seconds = serializers.FloatField()
@@ -1,25 +1,69 @@
 import logging
-from datetime import date
+from collections.abc import Callable, Generator, Iterable, Iterator
+from contextlib import closing, nullcontext
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time, timedelta
 from enum import Enum
+from itertools import islice
 from urllib.parse import parse_qs, urlencode, urlparse
+from uuid import UUID, uuid4
 
 from django.conf import settings
-from django.db import DatabaseError, IntegrityError, transaction
-from django.utils.dateparse import parse_datetime
+from django.db import (
+    DatabaseError,
+    IntegrityError,
+    connection,
+    models,
+    transaction,
+)
+from django.db.models import Max
+from django.utils import timezone
 from httpx import HTTPStatusError, RequestError
 from tenacity import (
     RetryError,
-    retry,
+    Retrying,
     retry_if_exception_type,
     stop_after_attempt,
     wait_exponential,
 )
 
-from core.http_clients import EventApiClient
+from core.http_clients import EventApiClient, get_api_client
 from events.models import Event, Venue
 
+from .cache import VenueCache
+from .decoding import (
+    JsonPageReader,
+    ProviderEvent,
+    decode_events,
+    venue_payload_hash,
+)
+from .exceptions import (
+    CannotReconcileError,
+    NoSyncStartError,
+    NothingToResumeError,
+)
+from .models import SyncLog, SyncProgress
+from .pipeline import prefetch
+from .reconcile import Reconcile, SeenEvents, reconcile_events
+from .stats import SyncStats
+
 logger = logging.getLogger(__name__)
 
+# Writes a batch of events, returning (created, updated, failed) counts.
+# Writers take an optional `stats` keyword to time venue resolution.
+BatchWriter = Callable[..., tuple[int, int, int]]
+
+
+@dataclass(slots=True)
+class EventBatch:
+    """Decoded events of (a part of) one provider page."""
+
+    url: str
+    events: list[ProviderEvent]
+    invalid: int = 0
+    next_url: str | None = None
+    page_done: bool = False
+
 
 class SyncResult(Enum):
     CREATED = "created"
@@ -30,154 +74,653 @@ class SyncResult(Enum):
 def sync_events(
         provider_url: str = settings.EVENT_PROVIDER_API_URL,
         from_date: date | None = None,
-        sync_all: bool = False
-    ) -> tuple[int, int, int]:
-    
-    if not from_date and not sync_all:
-        last_updated_event = Event.objects.order_by("updated_at").last()
-        if last_updated_event:
-            from_date = last_updated_event.updated_at.date().isoformat()
-    
-    url = provider_url
-    if not sync_all and from_date:
-        url += "?" + urlencode({"changed_at": from_date})
-    
-    created_total, updated_total, failed_total = 0, 0, 0
-    venue_cache = {}
-    with EventApiClient() as client:
-        while True:
-            try:
-                next_batch_url, events = fetch_event_batch(url, client)
-            except (HTTPStatusError, RequestError, RetryError) as e:
-                logger.exception(
-                    f"Unable to fetch events from events-provider url={url}: {e}"
+        sync_all: bool = False,
+        bulk: bool = False,
+        prefetch_batches: int = settings.SYNC_PREFETCH_BATCHES,
+        resume: bool = False,
+        venue_cache: VenueCache | None = None,
+        client: EventApiClient | None = None,
+        reconcile: Reconcile | None = None,
+    ) -> SyncLog:
+    """
+    Pull events from the provider and record the run in a `SyncLog`.
+
+    Every committed page is checkpointed on the run, so with `resume=True`
+    the latest interrupted run continues from its last committed page.
+    Requests go through `client`, the shared client by default.
+
+    With `reconcile`, a full sync then closes or deletes the local events
+    the provider didn't return, see `reconcile_events`.
+    """
+    if reconcile and (resume or not sync_all):
+        raise CannotReconcileError()
+
+    if resume:
+        sync_log = get_resumable_sync_log()
+        sync_log.status = SyncLog.Status.RUNNING
+        sync_log.finished_at = None
+        sync_log.error = ""
+        sync_log.save(update_fields=["status", "error", "finished_at"])
+        logger.info(f"Resuming sync {sync_log.pk} from {sync_log.cursor_url}")
+    else:
+        watermark = get_high_watermark()
+        url = build_start_url(provider_url, from_date, sync_all, watermark)
+        sync_log = SyncLog.objects.create(
+            start_url=url, cursor_url=url, high_watermark=watermark
+        )
+
+    write_batch = upsert_event_batch if bulk else create_event_batch
+
+    if venue_cache is None:
+        venue_cache = VenueCache()
+
+    with SeenEvents() if reconcile else nullcontext() as seen:
+        sync_pages(
+            sync_log,
+            client or get_api_client(),
+            write_batch,
+            venue_cache,
+            prefetch_batches,
+            seen,
+        )
+        if seen is not None:
+            reconcile_events(sync_log, seen, reconcile)
+
+    return sync_log
+
+
+def sync_pages(
+        progress: SyncProgress,
+        client: EventApiClient,
+        write_batch: BatchWriter,
+        venue_cache: VenueCache,
+        prefetch_batches: int = settings.SYNC_PREFETCH_BATCHES,
+        seen: SeenEvents | None = None,
+    ) -> None:
+    """
+    Sync the page chain starting at `progress.cursor_url`, checkpointing
+    every written page and finishing `progress` as succeeded or failed.
+    Stage timings and other `SyncStats` are stored with every checkpoint,
+    and provider ids are collected in `seen` if given.
+    """
+    stats = SyncStats.from_progress(progress)
+    try:
+        batches = iter_event_batches(progress.cursor_url, client, stats)
+        if prefetch_batches > 0:
+            batches = prefetch(batches, prefetch_batches, name="sync-fetcher")
+
+        with closing(batches):
+            for batch in batches:
+                with stats.timing("write", exclude="venue"):
+                    created, updated, failed = write_batch(
+                        batch.events, venue_cache, stats=stats
+                    )
+                failed += batch.invalid
+                stats.events_count += len(batch.events) + batch.invalid
+                if seen is not None:
+                    seen.add(batch.events, batch.invalid)
+                progress.record_page(
+                    batch.next_url,
+                    created,
+                    updated,
+                    failed,
+                    watermark=get_batch_watermark(batch.events),
+                    page_done=batch.page_done,
+                    stats=stats,
                 )
-                raise
-            
-            created, updated, failed = create_event_batch(
-                events, venue_cache
-            )
-            created_total += created
-            updated_total += updated
-            failed_total += failed
-
-            cursor = parse_qs(urlparse(url).query).get("cursor", "")
-            logger.info(
-                f"Synced batch ({cursor=}): "
-                f"{created} created, {updated} updated, {failed} failed"
-            )
 
-            if not next_batch_url:
-                break
+                cursor = parse_qs(urlparse(batch.url).query).get("cursor", "")
+                logger.info(
+                    f"Synced batch ({cursor=}): "
+                    f"{created} created, {updated} updated, {failed} failed"
+                )
+    except BaseException as e:
+        progress.finish(
+            SyncProgress.Status.FAILED, error=f"{type(e).__name__}: {e}", stats=stats
+        )
+        raise
 
-            url = next_batch_url
+    progress.finish(SyncProgress.Status.SUCCEEDED, stats=stats)
 
-    return created_total, updated_total, failed_total
 
+def build_start_url(
+        provider_url: str,
+        from_date: date | None,
+        sync_all: bool,
+        watermark: datetime | None = None,
+    ) -> str:
+    changed_at = None
+    if from_date:
+        changed_at = from_date.isoformat()
+    elif watermark:
+        changed_at = watermark.isoformat()
+    elif not sync_all:
+        # No run has recorded a watermark yet, guess from local data
+        last_updated = Event.objects.aggregate(Max("updated_at"))["updated_at__max"]
+        if last_updated:
+            changed_at = last_updated.date().isoformat()
 
-@retry(
-    stop=stop_after_attempt(5),
-    wait=wait_exponential(multiplier=1, min=1, max=10),
-    retry=retry_if_exception_type((RequestError, HTTPStatusError))
-)
-def fetch_event_batch(batch_url: str, client: EventApiClient) -> tuple[str, list[dict]]:
-    resp = client.get(batch_url, timeout=30)
-    resp.raise_for_status()
-    resp_json = resp.json()
+    url = provider_url
+    if not sync_all and changed_at:
+        url += "?" + urlencode({"changed_at": changed_at})
+
+    return url
+
+
+def get_high_watermark() -> datetime | None:
+    """Provider `changed_at` reached by the latest successful run."""
+    return (
+        SyncLog.objects
+        .filter(status=SyncLog.Status.SUCCEEDED)
+        .values_list("high_watermark", flat=True)
+        .first()
+    )
+
+
+def get_window_start(
+        from_date: date | None, sync_all: bool, watermark: datetime | None
+    ) -> datetime | None:
+    """
+    Lower `changed_at` bound of a windowed (concurrent or sharded) sync,
+    None for a full sync.
+    """
+    if sync_all:
+        return None
+    if from_date:
+        return datetime.combine(from_date, time(), tzinfo=UTC)
+    if watermark:
+        return watermark
+
+    raise NoSyncStartError()
+
+
+def split_windows(
+        since: datetime | None, until: datetime, window: timedelta
+    ) -> list[tuple[datetime | None, datetime]]:
+    """
+    Consecutive `changed_at` windows from `since` to `until`. Without
+    `since` they start at SYNC_HISTORY_START, and the first window has no
+    lower bound, so events changed before that date are synced too.
+    """
+    first = since or datetime.combine(
+        settings.SYNC_HISTORY_START, time(), tzinfo=UTC
+    )
+    windows = []
+    start = first
+    while start < until:
+        end = min(start + window, until)
+        windows.append((start, end))
+        start = end
+
+    # An empty range still gets one window, so recent changes are fetched
+    windows = windows or [(first, until)]
+    if since is None:
+        windows[0] = (None, windows[0][1])
+    return windows
+
+
+def window_url(provider_url: str, start: datetime | None, end: datetime) -> str:
+    params = {settings.EVENT_PROVIDER_CHANGED_BEFORE_PARAM: end.isoformat()}
+    if start is not None:
+        params = {"changed_at": start.isoformat(), **params}
+    return provider_url + "?" + urlencode(params)
+
+
+def get_batch_watermark(events: list[ProviderEvent]) -> datetime | None:
+    return max(
+        (event.changed_at for event in events if event.changed_at),
+        default=None,
+    )
+
+
+def get_resumable_sync_log() -> SyncLog:
+    """Latest run, provided it was interrupted before its last page."""
+    sync_log = SyncLog.objects.first()
+    if (
+        sync_log is None
+        or sync_log.status == SyncLog.Status.SUCCEEDED
+        or not sync_log.cursor_url
+    ):
+        raise NothingToResumeError()
+
+    return sync_log
 
-    next_batch_url = resp_json["next"]
-    events = resp_json["results"]
 
-    return next_batch_url, events
+def iter_event_batches(
+        url: str,
+        client: EventApiClient,
+        stats: SyncStats,
+        batch_size: int = settings.SYNC_BATCH_SIZE,
+    ) -> Iterator[EventBatch]:
+    """Follow the provider's `next` chain, yielding decoded event batches."""
+    while url:
+        url = yield from iter_page_batches(url, client, stats, batch_size)
+
+
+def iter_page_batches(
+        url: str, client: EventApiClient, stats: SyncStats, batch_size: int
+    ) -> Generator[EventBatch, None, str | None]:
+    """
+    Stream one provider page, yielding its events in batches of at most
+    `batch_size` as they are decoded. The last batch has `page_done` set
+    and carries the page's `next` url, which is also returned.
+
+    Failed requests are retried; events already yielded by an interrupted
+    attempt are skipped when the page is read again.
+    """
+    emitted = 0
+    try:
+        for attempt in Retrying(
+            stop=stop_after_attempt(5),
+            wait=wait_exponential(multiplier=1, min=1, max=10),
+            retry=retry_if_exception_type((RequestError, HTTPStatusError)),
+            before_sleep=stats.count_retry,
+        ):
+            with attempt:
+                with stats.timing("fetch"):
+                    resp = client.send(
+                        client.build_request("GET", url, timeout=30), stream=True
+                    )
+                with closing(resp):
+                    resp.raise_for_status()
+                    page = JsonPageReader(stats.timed_download(resp.iter_bytes()))
+                    items = islice(page, emitted, None)
+
+                    while True:
+                        with stats.timing("decode", exclude="fetch"):
+                            events, invalid = decode_events(islice(items, batch_size))
+                        if len(events) + invalid < batch_size:
+                            break
+
+                        yield EventBatch(url, events, invalid)
+                        emitted += batch_size
+
+                    next_url = page.fields["next"]
+                    yield EventBatch(url, events, invalid, next_url, page_done=True)
+                    return next_url
+    except (HTTPStatusError, RequestError, RetryError):
+        logger.exception(f"Unable to fetch events from events-provider url={url}")
+        raise
 
 
 def create_event_batch(
-        events: list[dict], venue_cache: dict[str, Venue]
+        events: list[ProviderEvent],
+        venue_cache: VenueCache,
+        stats: SyncStats | None = None,
+        atomic_batch: bool = settings.SYNC_ATOMIC_BATCHES,
     ) -> tuple[int, int, int]:
+    """
+    Write events one by one through the ORM.
+
+    With `atomic_batch` the whole batch is committed in one transaction,
+    see `write_isolated`; otherwise every event is its own transaction.
+    """
+    if stats is None:
+        stats = SyncStats()
+
+    if atomic_batch:
+        def write(chunk: list[ProviderEvent]) -> tuple[int, int, int]:
+            try:
+                return write_events(chunk, venue_cache, stats)
+            except (IntegrityError, DatabaseError):
+                # Venues cached by a rolled back attempt may not exist
+                for event in chunk:
+                    venue_cache.discard(event.venue_id)
+                raise
+
+        with transaction.atomic():
+            return write_isolated(events, write)
+
     created, updated, failed = 0, 0, 0
     for event in events:
         try:
-            venue_data = event["place"]
-            venue_id = venue_data["id"]
-
             with transaction.atomic():
-                if venue_id in venue_cache:
-                    venue = venue_cache[venue_id]
-                else:
-                    venue = create_or_update_venue(venue_data)
-                    venue_cache[venue_id] = venue
-
-                _, sync_result = create_or_update_event(event, venue)
-            
-            if sync_result == SyncResult.CREATED:
-                created += 1
-            elif sync_result == SyncResult.UPDATED:
-                updated += 1
-        except KeyError as e:
-            logger.error(f"Missing required key in event: {e}")
+                chunk_created, chunk_updated, _ = write_events(
+                    [event], venue_cache, stats
+                )
+            created += chunk_created
+            updated += chunk_updated
+        except (IntegrityError, DatabaseError):
+            logger.exception("Database error while creating/updating event")
+            venue_cache.discard(event.venue_id)
             failed += 1
             continue
-        except (IntegrityError, DatabaseError) as e:
-            logger.exception(f"Database error while creating/updating event: {e}")
+
+    return created, updated, failed
+
+
+def write_events(
+        events: list[ProviderEvent], venue_cache: VenueCache, stats: SyncStats
+    ) -> tuple[int, int, int]:
+    created, updated = 0, 0
+    for event in events:
+        # A cached venue renamed since it was stored counts as a miss
+        venue = venue_cache.get(event.venue_id)
+        if venue is None or venue.payload_hash != event.venue_hash:
+            with stats.timing("venue"):
+                venue = create_or_update_venue(
+                    {"id": event.venue_id, "name": event.venue_name}
+                )
+            venue_cache[event.venue_id] = venue
+
+        sync_result = create_or_update_event(event, venue)
+        if sync_result == SyncResult.CREATED:
+            created += 1
+        elif sync_result == SyncResult.UPDATED:
+            updated += 1
+
+    return created, updated, 0
+
+
+def write_isolated[T](
+        items: list[T], write: Callable[[list[T]], tuple[int, int, int]]
+    ) -> tuple[int, int, int]:
+    """
+    Write `items` in a savepoint, isolating the ones that fail.
+
+    When the savepoint hits a database error, it is rolled back and both
+    halves of `items` are retried in their own savepoints, down to single
+    items which are counted as failed. A few bad rows cost a number of
+    savepoints logarithmic in the batch size, while the good rows are
+    still written together.
+    """
+    try:
+        with transaction.atomic():
+            return write(items)
+    except (IntegrityError, DatabaseError):
+        if len(items) <= 1:
+            logger.exception("Database error while creating/updating event")
+            return 0, 0, len(items)
+
+    middle = len(items) // 2
+    first = write_isolated(items[:middle], write)
+    second = write_isolated(items[middle:], write)
+    return (
+        first[0] + second[0],
+        first[1] + second[1],
+        first[2] + second[2],
+    )
+
+
+# Columns written by the bulk upsert, in the order rows are built
+# by `build_event_row` (provider_id first, it is the conflict target).
+EVENT_UPSERT_FIELDS = (
+    "provider_id",
+    "name",
+    "event_time",
+    "registration_deadline",
+    "status",
+    "venue",
+    "payload_hash",
+)
+EVENT_UPSERT_CHUNK_SIZE = 1000
+
+
+def upsert_event_batch(
+        events: list[ProviderEvent],
+        venue_cache: VenueCache,
+        stats: SyncStats | None = None,
+    ) -> tuple[int, int, int]:
+    """
+    Set-based counterpart of `create_event_batch`.
+
+    Stored payload hashes of the batch are read with one query, events whose
+    hash matches are skipped, and everything new or changed is written with
+    multi-row `INSERT ... ON CONFLICT DO UPDATE` in a single transaction.
+    Rows failing with a database error are isolated by `write_isolated`.
+    """
+    # Last occurrence wins: ON CONFLICT can't touch the same row twice
+    latest = {event.provider_id: event for event in events}
+
+    stored_hashes = dict(
+        Event.objects
+        .filter(provider_id__in=latest)
+        .values_list("provider_id", "payload_hash")
+    )
+
+    if stats is None:
+        stats = SyncStats()
+    with stats.timing("venue"):
+        venues = resolve_venues(latest.values(), venue_cache)
+
+    rows, failed = [], 0
+    for event in latest.values():
+        # Venues are resolved even for unchanged events: a renamed
+        # venue doesn't change the payload hash of its events
+        venue = venues.get(event.venue_id)
+        if venue is None:
             failed += 1
             continue
 
-    return created, updated, failed
+        if stored_hashes.get(event.provider_id) != event.payload_hash:
+            rows.append(build_event_row(event, venue))
+
+    def write(chunk: list[tuple]) -> tuple[int, int, int]:
+        created, updated = 0, 0
+        for start in range(0, len(chunk), EVENT_UPSERT_CHUNK_SIZE):
+            chunk_created, chunk_updated = upsert_event_rows(
+                chunk[start:start + EVENT_UPSERT_CHUNK_SIZE]
+            )
+            created += chunk_created
+            updated += chunk_updated
+        return created, updated, 0
+
+    with transaction.atomic():
+        created, updated, rows_failed = write_isolated(rows, write)
+
+    return created, updated, failed + rows_failed
+
+
+def resolve_venues(
+        events: Iterable[ProviderEvent], venue_cache: VenueCache
+    ) -> dict[UUID, Venue]:
+    """
+    Map the provider venue ids of a batch to local venues.
+
+    Cached venues with an unchanged payload hash cost nothing, the rest are
+    read with one query and new or renamed ones are written with one bulk
+    upsert. Venues that can't be resolved are left out of the result.
+    """
+    resolved: dict[UUID, Venue] = {}
+    pending: dict[UUID, Venue] = {}
+    for event in events:
+        venue_id = event.venue_id
+        if venue_id in resolved or venue_id in pending:
+            continue
+
+        venue = Venue(
+            provider_id=venue_id,
+            name=event.venue_name,
+            payload_hash=event.venue_hash,
+        )
+        cached = venue_cache.get(venue_id)
+        if cached is not None and cached.payload_hash == venue.payload_hash:
+            resolved[venue_id] = cached
+        else:
+            pending[venue_id] = venue
+
+    if not pending:
+        return resolved
+
+    for stored in Venue.objects.filter(provider_id__in=pending):
+        venue_id = stored.provider_id
+        if stored.payload_hash == pending[venue_id].payload_hash:
+            resolved[venue_id] = venue_cache[venue_id] = stored
+            del pending[venue_id]
+
+    if pending:
+        try:
+            with transaction.atomic():
+                written = upsert_venue_rows([
+                    (venue.provider_id, venue.name, venue.payload_hash)
+                    for venue in pending.values()
+                ])
+        except (IntegrityError, DatabaseError):
+            logger.exception(
+                "Bulk venue upsert failed, falling back to per-venue writes"
+            )
+            written = []
+            for venue in pending.values():
+                try:
+                    with transaction.atomic():
+                        written.append(create_or_update_venue({
+                            "id": venue.provider_id, "name": venue.name,
+                        }))
+                except (IntegrityError, DatabaseError):
+                    logger.exception("Database error while creating/updating venue")
+
+        for venue in written:
+            resolved[venue.provider_id] = venue_cache[venue.provider_id] = venue
+
+    return resolved
+
+
+def build_event_row(event: ProviderEvent, venue: Venue) -> tuple:
+    return (
+        event.provider_id,
+        event.name,
+        event.event_time,
+        event.registration_deadline,
+        event.status,
+        venue.pk,
+        event.payload_hash,
+    )
+
+
+def upsert_event_rows(rows: list[tuple]) -> tuple[int, int]:
+    """
+    Write rows with a single `INSERT ... ON CONFLICT (provider_id) DO UPDATE`.
+
+    The conflict branch only fires when a field actually differs, so rows
+    changed concurrently to the same values are not rewritten. Returns
+    `(created, updated)` counted from what Postgres reports back.
+    """
+    if not rows:
+        return 0, 0
+
+    written = [
+        inserted
+        for (inserted,) in execute_upsert(
+            Event, EVENT_UPSERT_FIELDS, rows, returning="xmax = 0"
+        )
+    ]
+
+    created = sum(written)
+    return created, len(written) - created
+
+
+def upsert_venue_rows(rows: list[tuple]) -> list[Venue]:
+    """Write `(provider_id, name, payload_hash)` rows, returning their venues."""
+    fields = ("provider_id", "name", "payload_hash")
+    return [
+        Venue(id=pk, provider_id=provider_id, name=name, payload_hash=payload_hash)
+        for pk, provider_id, name, payload_hash in execute_upsert(
+            Venue,
+            fields,
+            rows,
+            returning=", ".join(["id", *fields]),
+            only_changed=False,
+        )
+    ]
+
+
+def execute_upsert(
+        model: type[models.Model],
+        fields: tuple[str, ...],
+        rows: list[tuple],
+        returning: str,
+        only_changed: bool = True,
+    ) -> list[tuple]:
+    """
+    Run a multi-row `INSERT ... ON CONFLICT DO UPDATE` on `model`.
+
+    `fields[0]` is the conflict target and rows hold values in `fields`
+    order; `id`, `created_at` and `updated_at` are filled in here. With
+    `only_changed` the conflict branch skips rows whose values all match,
+    and those rows are missing from the returned `returning` tuples.
+    """
+    opts = model._meta
+    table = opts.db_table
+    columns = [opts.get_field(field).column for field in fields]
+    data_columns = columns[1:]
+    qn = connection.ops.quote_name
+
+    insert_columns = ", ".join(
+        qn(column)
+        for column in ["id", *columns, "created_at", "updated_at"]
+    )
+    row_placeholder = "(" + ", ".join(["%s"] * (len(columns) + 3)) + ")"
+    assignments = ", ".join(
+        f"{qn(column)} = EXCLUDED.{qn(column)}"
+        for column in [*data_columns, "updated_at"]
+    )
+
+    sql = (
+        f"INSERT INTO {qn(table)} ({insert_columns}) "
+        f"VALUES {', '.join([row_placeholder] * len(rows))} "
+        f"ON CONFLICT ({qn(columns[0])}) DO UPDATE SET {assignments} "
+    )
+    if only_changed:
+        current = ", ".join(f"{qn(table)}.{qn(column)}" for column in data_columns)
+        excluded = ", ".join(f"EXCLUDED.{qn(column)}" for column in data_columns)
+        sql += f"WHERE ({current}) IS DISTINCT FROM ({excluded}) "
+    sql += f"RETURNING {returning}"
+
+    now = timezone.now()
+    params = []
+    for row in rows:
+        params.extend((uuid4(), *row, now, now))
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
 
 
 def create_or_update_venue(venue_data: dict) -> Venue:
     provider_id=venue_data["id"]
     defaults={
-        "name": venue_data["name"]
+        "name": venue_data["name"],
+        "payload_hash": venue_payload_hash(venue_data),
     }
     
     try:
         venue = (
             Venue.objects.get(provider_id=provider_id)
         )
-        changed = False
-        for field, value in defaults.items():
-            if getattr(venue, field) != value:
+        if venue.payload_hash != defaults["payload_hash"]:
+            for field, value in defaults.items():
                 setattr(venue, field, value)
-                changed = True
-        
-        if changed:
-            venue.save(update_fields=tuple(defaults.keys()))
+            venue.save(update_fields=(*defaults.keys(), "updated_at"))
     except Venue.DoesNotExist:
         venue = Venue.objects.create(provider_id=provider_id, **defaults)
     
     return venue
 
 
-def create_or_update_event(
-        event_data: dict, venue: Venue
-    ) -> tuple[Event, SyncResult]:
-    provider_id = event_data["id"]
+def create_or_update_event(event: ProviderEvent, venue: Venue) -> SyncResult:
+    stored = (
+        Event.objects
+        .filter(provider_id=event.provider_id)
+        .values_list("pk", "payload_hash")
+        .first()
+    )
+    if stored and stored[1] == event.payload_hash:
+        return SyncResult.UNCHANGED
+
     defaults = {
-        "name": event_data["name"],
-        "event_time": parse_datetime(event_data["event_time"]),
-        "registration_deadline": parse_datetime(event_data["registration_deadline"]),
-        "status": event_data["status"],
+        "name": event.name,
+        "event_time": event.event_time,
+        "registration_deadline": event.registration_deadline,
+        "status": event.status,
         "venue": venue,
+        "payload_hash": event.payload_hash,
     }
 
-    try:
-        event = (
-            Event.objects
-            .select_related("venue")
-            .get(provider_id=provider_id)
+    if stored:
+        Event.objects.filter(pk=stored[0]).update(
+            **defaults, updated_at=timezone.now()
         )
-        changed = False
-        for field, value in defaults.items():
-            if getattr(event, field) != value:
-                setattr(event, field, value)
-                changed = True
-        
-        if changed:
-            event.save(update_fields=tuple(defaults.keys()))
-            return event, SyncResult.UPDATED
-        
-        return event, SyncResult.UNCHANGED
-    except Event.DoesNotExist:
-        event = Event.objects.create(provider_id=provider_id, **defaults)
-        return event, SyncResult.CREATED
+        return SyncResult.UPDATED
+
+    Event.objects.create(provider_id=event.provider_id, **defaults)
+    return SyncResult.CREATED
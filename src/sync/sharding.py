@@ -0,0 +1,233 @@
+import logging
+import multiprocessing
+import os
+import socket
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from core.http_clients import get_api_client
+
+from .cache import VenueCache
+from .exceptions import NothingToJoinError
+from .locks import advisory_unlock, try_advisory_lock
+from .models import SyncLog, SyncShard
+from .process import run_shard_worker_process
+from .services import (
+    create_event_batch,
+    get_high_watermark,
+    get_window_start,
+    split_windows,
+    sync_pages,
+    upsert_event_batch,
+    window_url,
+)
+from .stats import SyncStats
+
+logger = logging.getLogger(__name__)
+
+UNFINISHED_SHARD_STATUSES = (SyncShard.Status.PENDING, SyncShard.Status.RUNNING)
+
+
+def create_sharded_sync(
+        provider_url: str = settings.EVENT_PROVIDER_API_URL,
+        from_date: date | None = None,
+        sync_all: bool = False,
+        window: timedelta = timedelta(days=settings.SYNC_WINDOW_DAYS),
+    ) -> SyncLog:
+    """Create a run whose `changed_at` range is split into pending shards."""
+    watermark = get_high_watermark()
+    since = get_window_start(from_date, sync_all, watermark)
+    windows = split_windows(since, timezone.now(), window)
+
+    with transaction.atomic():
+        sync_log = SyncLog.objects.create(
+            start_url=window_url(provider_url, *windows[0]),
+            high_watermark=watermark,
+        )
+        SyncShard.objects.bulk_create([
+            SyncShard(
+                sync_log=sync_log,
+                status=SyncShard.Status.PENDING,
+                changed_from=start,
+                changed_before=end,
+                cursor_url=window_url(provider_url, start, end),
+            )
+            for start, end in windows
+        ])
+
+    return sync_log
+
+
+def run_sharded_sync(
+        sync_log: SyncLog,
+        workers: int,
+        bulk: bool = False,
+        prefetch_batches: int = settings.SYNC_PREFETCH_BATCHES,
+    ) -> SyncLog:
+    """
+    Sync the shards of `sync_log` with `workers` processes and merge them.
+
+    Other hosts may join with `join_sharded_sync`. Once the local workers
+    run out of shards, this picks up shards left by crashed workers and
+    waits for ones still held elsewhere before merging.
+    """
+    start_shard_workers(sync_log, workers, bulk, prefetch_batches)
+
+    while True:
+        run_shard_worker(sync_log.pk, bulk, prefetch_batches)
+        if not sync_log.shards.filter(status__in=UNFINISHED_SHARD_STATUSES).exists():
+            break
+        time.sleep(settings.SYNC_SHARD_POLL_SECONDS)
+
+    return merge_shards(sync_log)
+
+
+def join_sharded_sync(
+        workers: int,
+        bulk: bool = False,
+        prefetch_batches: int = settings.SYNC_PREFETCH_BATCHES,
+    ) -> SyncLog:
+    """Help the latest running sharded run with `workers` more processes."""
+    sync_log = get_joinable_sync_log()
+    start_shard_workers(sync_log, workers, bulk, prefetch_batches)
+    sync_log.refresh_from_db()
+    return sync_log
+
+
+def get_joinable_sync_log() -> SyncLog:
+    sync_log = (
+        SyncLog.objects
+        .filter(status=SyncLog.Status.RUNNING, shards__isnull=False)
+        .distinct()
+        .first()
+    )
+    if sync_log is None:
+        raise NothingToJoinError()
+
+    return sync_log
+
+
+def start_shard_workers(
+        sync_log: SyncLog, workers: int, bulk: bool, prefetch_batches: int
+    ) -> None:
+    """Run `workers` shard worker processes and wait for them to finish."""
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(
+            target=run_shard_worker_process,
+            args=(sync_log.pk, bulk, prefetch_batches),
+            name=f"sync-worker-{number}",
+        )
+        for number in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        if process.exitcode:
+            logger.error(f"{process.name} exited with code {process.exitcode}")
+
+
+def merge_shards(sync_log: SyncLog) -> SyncLog:
+    """Sum shard counters into the run and finish it."""
+    totals = sync_log.shards.aggregate(
+        pages=Sum("pages_count", default=0),
+        created=Sum("created_count", default=0),
+        updated=Sum("updated_count", default=0),
+        failed=Sum("failed_count", default=0),
+        watermark=Max("high_watermark"),
+        **{field: Sum(field, default=0) for field in SyncStats.field_names()},
+    )
+    sync_log.pages_count = totals["pages"]
+    sync_log.created_count = totals["created"]
+    sync_log.updated_count = totals["updated"]
+    sync_log.failed_count = totals["failed"]
+    for field in SyncStats.field_names():
+        setattr(sync_log, field, totals[field])
+    if totals["watermark"] and (
+        sync_log.high_watermark is None
+        or totals["watermark"] > sync_log.high_watermark
+    ):
+        sync_log.high_watermark = totals["watermark"]
+    sync_log.save(update_fields=[
+        "pages_count",
+        "created_count",
+        "updated_count",
+        "failed_count",
+        "high_watermark",
+        *SyncStats.field_names(),
+    ])
+
+    failed_shards = sync_log.shards.exclude(
+        status=SyncShard.Status.SUCCEEDED
+    ).count()
+    if failed_shards:
+        sync_log.finish(
+            SyncLog.Status.FAILED, error=f"{failed_shards} shards failed"
+        )
+    else:
+        sync_log.finish(SyncLog.Status.SUCCEEDED)
+    return sync_log
+
+
+def run_shard_worker(
+        sync_log_id: int,
+        bulk: bool = False,
+        prefetch_batches: int = settings.SYNC_PREFETCH_BATCHES,
+    ) -> int:
+    """Claim and sync shards of a run until none is left, returning how many."""
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    write_batch = upsert_event_batch if bulk else create_event_batch
+    venue_cache = VenueCache()
+
+    client = get_api_client()
+
+    synced = 0
+    while (shard := claim_shard(sync_log_id, worker)) is not None:
+        try:
+            sync_pages(shard, client, write_batch, venue_cache, prefetch_batches)
+        except Exception:
+            logger.exception(f"Failed to sync {shard}")
+        finally:
+            advisory_unlock(shard.pk)
+        synced += 1
+
+    return synced
+
+
+def claim_shard(sync_log_id: int, worker: str) -> SyncShard | None:
+    """
+    Lock the next unfinished shard of a run.
+
+    Claims are Postgres advisory locks on the shard id, so no two workers
+    sync a shard at once, and a crashed worker's shard is freed together
+    with its database session. The caller must unlock the returned shard.
+    """
+    candidates = (
+        SyncShard.objects
+        .filter(sync_log_id=sync_log_id, status__in=UNFINISHED_SHARD_STATUSES)
+        .values_list("pk", flat=True)
+    )
+    for shard_id in candidates:
+        if not try_advisory_lock(shard_id):
+            continue
+
+        shard = SyncShard.objects.get(pk=shard_id)
+        if shard.status not in UNFINISHED_SHARD_STATUSES:
+            # Finished between listing and locking
+            advisory_unlock(shard_id)
+            continue
+
+        shard.status = SyncShard.Status.RUNNING
+        shard.worker = worker
+        shard.started_at = timezone.now()
+        shard.save(update_fields=["status", "worker", "started_at"])
+        logger.info(f"{worker} claimed {shard}")
+        return shard
+
+    return None
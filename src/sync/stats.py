@@ -0,0 +1,83 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from time import perf_counter
+
+from tenacity import RetryCallState
+
+
+@dataclass(slots=True)
+class SyncStats:
+    """
+    Running totals of a sync, stored on its `SyncProgress` record.
+
+    Field names match the model fields. Stage times are wall seconds spent
+    in that stage, so they add up to more than the run time when stages
+    overlap (prefetch, concurrent requests).
+    """
+
+    events_count: int = 0
+    bytes_downloaded: int = 0
+    retries_count: int = 0
+    fetch_seconds: float = 0.0
+    decode_seconds: float = 0.0
+    venue_seconds: float = 0.0
+    write_seconds: float = 0.0
+
+    @classmethod
+    def from_progress(cls, progress) -> "SyncStats":
+        """Continue from the totals of `progress`, e.g. of a resumed run."""
+        return cls(**{
+            field.name: getattr(progress, field.name) for field in fields(cls)
+        })
+
+    @classmethod
+    def field_names(cls) -> list[str]:
+        return [field.name for field in fields(cls)]
+
+    def apply(self, progress) -> None:
+        for field in fields(self):
+            setattr(progress, field.name, getattr(self, field.name))
+
+    @contextmanager
+    def timing(self, stage: str, exclude: str | None = None) -> Iterator[None]:
+        """
+        Add the time spent in the block to `<stage>_seconds`, minus the time
+        the block itself added to the `exclude` stage.
+        """
+        started = perf_counter()
+        excluded = getattr(self, f"{exclude}_seconds") if exclude else 0.0
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - started
+            if exclude:
+                elapsed -= getattr(self, f"{exclude}_seconds") - excluded
+            setattr(
+                self, f"{stage}_seconds", getattr(self, f"{stage}_seconds") + elapsed
+            )
+
+    def timed_download(self, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        """Count the time waiting for and the size of response chunks."""
+        while True:
+            started = perf_counter()
+            chunk = next(chunks, None)
+            self.fetch_seconds += perf_counter() - started
+            if chunk is None:
+                return
+            self.bytes_downloaded += len(chunk)
+            yield chunk
+
+    def count_retry(self, retry_state: RetryCallState) -> None:
+        """tenacity `before_sleep` hook."""
+        self.retries_count += 1
+
+
+def count_retry(retry_state: RetryCallState) -> None:
+    """
+    tenacity `before_sleep` hook for decorated functions taking a `stats`
+    keyword argument.
+    """
+    stats = retry_state.kwargs.get("stats")
+    if stats is not None:
+        stats.retries_count += 1
@@ -1,3 +1,568 @@
-from django.test import TestCase
+import json
+import random
+import threading
+from datetime import UTC, date, datetime, timedelta
+from hashlib import blake2b
+from itertools import pairwise
+from unittest import mock
+from uuid import uuid4
 
-# Create your tests here.
+import httpx
+from django.db import IntegrityError, connection
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.utils import timezone
+
+from events.models import Event, EventRegistration, Venue
+from sync.cache import VenueCache
+from sync.daemon import SyncDaemon
+from sync.decoding import (
+    JsonPageReader,
+    ProviderEvent,
+    decode_events,
+    hash_payload,
+)
+from sync.exceptions import (
+    CannotReconcileError,
+    NothingToResumeError,
+    SyncAlreadyRunningError,
+)
+from sync.fake_provider import FakeProvider
+from sync.locks import (
+    SYNC_LOCK_NAMESPACE,
+    SYNC_RUN_LOCK_ID,
+    advisory_lock,
+    advisory_unlock,
+)
+from sync.models import SyncLog, SyncShard
+from sync.pipeline import prefetch
+from sync.reconcile import Reconcile, SeenEvents, reconcile_events
+from sync.services import (
+    get_window_start,
+    resolve_venues,
+    split_windows,
+    sync_events,
+    upsert_event_batch,
+    window_url,
+    write_isolated,
+)
+from sync.sharding import (
+    claim_shard,
+    create_sharded_sync,
+    merge_shards,
+    run_shard_worker,
+)
+
+
+def make_payload(**overrides) -> dict:
+    payload = {
+        "id": str(uuid4()),
+        "name": "Концерт",
+        "event_time": "2030-01-01T19:00:00+00:00",
+        "registration_deadline": "2029-12-31T19:00:00+00:00",
+        "status": "open",
+        "changed_at": "2029-01-01T00:00:00+00:00",
+        "place": {"id": str(uuid4()), "name": "Площадка"},
+    }
+    payload.update(overrides)
+    return payload
+
+
+class JsonPageReaderTests(TestCase):
+    def test_reads_randomly_chunked_page(self):
+        items = [
+            make_payload(name=f"Событие {i} ✓", number=i * 1.5, flag=i % 2 == 0)
+            for i in range(50)
+        ]
+        body = json.dumps(
+            {"next": "http://provider.test/events/?cursor=2", "results": items,
+             "count": 12345},
+            ensure_ascii=False,
+            indent=1,
+        ).encode()
+
+        rng = random.Random(0)
+        for _ in range(20):
+            cuts = sorted(rng.sample(range(1, len(body)), rng.randint(1, 200)))
+            chunks = [body[i:j] for i, j in zip([0, *cuts], [*cuts, len(body)])]
+
+            reader = JsonPageReader(chunks)
+            self.assertEqual(list(reader), items)
+            self.assertEqual(reader.fields, {
+                "next": "http://provider.test/events/?cursor=2", "count": 12345,
+            })
+
+    def test_reads_one_byte_chunks(self):
+        body = b'{"results": [1, 22, -3.5e2, true, null, "\xd0\xaf"], "next": null}'
+        reader = JsonPageReader(body[i:i + 1] for i in range(len(body)))
+        self.assertEqual(list(reader), [1, 22, -350.0, True, None, "Я"])
+        self.assertEqual(reader.fields, {"next": None})
+
+    def test_empty_page(self):
+        self.assertEqual(list(JsonPageReader([b"{}"])), [])
+        self.assertEqual(list(JsonPageReader([b'{"results": []}'])), [])
+
+    def test_truncated_page(self):
+        with self.assertRaises(ValueError):
+            list(JsonPageReader([b'{"results": [1, 2', b", 3"]))
+
+
+class ProviderEventTests(TestCase):
+    def test_invalid_venue_id(self):
+        events, invalid = decode_events([
+            make_payload(),
+            make_payload(place={"id": "not-a-uuid", "name": "Площадка"}),
+        ])
+        self.assertEqual(len(events), 1)
+        self.assertEqual(invalid, 1)
+
+    def test_hash_matches_json_encoding(self):
+        values = ("Концерт \"№1\"", "a\\b\n\u2028", "")
+        encoded = json.dumps(values, separators=(",", ":"), ensure_ascii=False)
+        self.assertEqual(
+            hash_payload(*values),
+            blake2b(encoded.encode(), digest_size=16).hexdigest(),
+        )
+
+
+class PrefetchTests(SimpleTestCase):
+    def test_yields_in_order(self):
+        self.assertEqual(list(prefetch(iter(range(100)), 3)), list(range(100)))
+
+    def test_reraises_producer_error(self):
+        def items():
+            yield 1
+            raise ValueError("bad page")
+
+        batches = prefetch(items(), 2)
+        self.assertEqual(next(batches), 1)
+        with self.assertRaisesMessage(ValueError, "bad page"):
+            next(batches)
+
+    def test_early_close_stops_producer(self):
+        closed = threading.Event()
+
+        def items():
+            try:
+                yield from range(1000)
+            finally:
+                closed.set()
+
+        batches = prefetch(items(), 2)
+        self.assertEqual(next(batches), 0)
+        batches.close()
+        self.assertTrue(closed.is_set())
+
+
+class VenueCacheTests(TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = VenueCache(maxsize=2)
+        ids = [uuid4() for _ in range(3)]
+        cache[ids[0]] = Venue(name="0")
+        cache[ids[1]] = Venue(name="1")
+        cache.get(ids[0])
+        cache[ids[2]] = Venue(name="2")
+
+        self.assertEqual(len(cache), 2)
+        self.assertIn(ids[0], cache)
+        self.assertNotIn(ids[1], cache)
+
+    def test_resolves_batch_then_serves_from_cache(self):
+        places = [{"id": str(uuid4()), "name": f"Площадка {i}"} for i in range(3)]
+        events = [
+            ProviderEvent.from_payload(make_payload(place=places[i % 3]))
+            for i in range(9)
+        ]
+        cache = VenueCache()
+
+        resolved = resolve_venues(events, cache)
+        self.assertEqual(len(resolved), 3)
+        self.assertEqual(Venue.objects.count(), 3)
+        self.assertEqual(len(cache), 3)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_venues(events, cache), resolved)
+
+    def test_refreshes_renamed_venue(self):
+        place = {"id": str(uuid4()), "name": "Площадка"}
+        cache = VenueCache()
+        resolve_venues([ProviderEvent.from_payload(make_payload(place=place))], cache)
+
+        renamed = ProviderEvent.from_payload(
+            make_payload(place={**place, "name": "Новая площадка"})
+        )
+        venue = resolve_venues([renamed], cache)[renamed.venue_id]
+        self.assertEqual(venue.name, "Новая площадка")
+        self.assertEqual(cache[renamed.venue_id].name, "Новая площадка")
+        self.assertEqual(Venue.objects.get().name, "Новая площадка")
+
+
+class WriteIsolatedTests(TestCase):
+    def test_bisects_around_bad_row(self):
+        Venue.objects.create(name="taken")
+        names = [f"venue {i}" for i in range(16)]
+        names[11] = "taken"
+        calls = []
+
+        def write(chunk: list[str]) -> tuple[int, int, int]:
+            calls.append(len(chunk))
+            Venue.objects.bulk_create([Venue(name=name) for name in chunk])
+            return len(chunk), 0, 0
+
+        self.assertEqual(write_isolated(names, write), (15, 0, 1))
+        self.assertEqual(Venue.objects.count(), 16)
+        # The whole batch, then both halves on each level down to one row
+        self.assertEqual(len(calls), 1 + 2 * 4)
+
+    def test_single_bad_row(self):
+        def write(chunk: list[str]) -> tuple[int, int, int]:
+            raise IntegrityError("duplicate key")
+
+        self.assertEqual(write_isolated(["bad"], write), (0, 0, 1))
+
+
+class UpsertEventBatchTests(TestCase):
+    def test_counts_created_and_updated(self):
+        venue = {"id": str(uuid4()), "name": "Площадка"}
+        payloads = [make_payload(name=f"Событие {i}", place=venue) for i in range(5)]
+        cache = VenueCache()
+
+        events = [ProviderEvent.from_payload(payload) for payload in payloads]
+        self.assertEqual(upsert_event_batch(events, cache), (5, 0, 0))
+        self.assertEqual(Event.objects.count(), 5)
+
+        # Unchanged events are skipped
+        self.assertEqual(upsert_event_batch(events, cache), (0, 0, 0))
+
+        payloads[0]["name"] = "Переименовано"
+        payloads.append(make_payload(place=venue))
+        events = [ProviderEvent.from_payload(payload) for payload in payloads]
+        self.assertEqual(upsert_event_batch(events, cache), (1, 1, 0))
+        self.assertTrue(Event.objects.filter(name="Переименовано").exists())
+        self.assertEqual(Event.objects.count(), 6)
+        self.assertEqual(Venue.objects.count(), 1)
+
+    def test_last_occurrence_wins(self):
+        payload = make_payload()
+        events = [
+            ProviderEvent.from_payload(payload),
+            ProviderEvent.from_payload({**payload, "name": "Последнее"}),
+        ]
+        self.assertEqual(upsert_event_batch(events, VenueCache()), (1, 0, 0))
+        self.assertEqual(Event.objects.get().name, "Последнее")
+
+
+class SyncDaemonTests(TestCase):
+    def setUp(self):
+        self.provider = FakeProvider(events=20, venues=3, page_size=6)
+        self.client = self.provider.client()
+        self.addCleanup(self.client.close)
+        self.daemon = SyncDaemon(
+            self.provider.base_url,
+            client=self.client,
+            min_interval=1,
+            max_interval=8,
+        )
+
+    def test_polls_with_conditional_requests(self):
+        self.assertTrue(self.daemon.sync(sync_all=True))
+        self.assertEqual(Event.objects.count(), 20)
+
+        # The first probe has no validators yet, the run finds nothing new
+        self.assertFalse(self.daemon.poll())
+        runs = SyncLog.objects.count()
+        requests = self.provider.requests_count
+
+        self.assertFalse(self.daemon.poll())
+        self.assertEqual(self.provider.not_modified_count, 1)
+        self.assertEqual(self.provider.requests_count, requests + 1)
+        self.assertEqual(SyncLog.objects.count(), runs)
+
+        self.provider.change(0.25)
+        self.assertTrue(self.daemon.poll())
+        self.assertEqual(SyncLog.objects.first().updated_count, 5)
+        self.assertEqual(Event.objects.filter(name__contains=" #").count(), 5)
+
+    def test_interval_backs_off_until_a_change(self):
+        intervals = [self.daemon.next_interval(False) for _ in range(5)]
+        self.assertEqual(intervals, [2, 4, 8, 8, 8])
+        self.assertEqual(self.daemon.next_interval(True), 1)
+
+
+class SyncDaemonLockTests(TransactionTestCase):
+    """The daemon keeps the run lock its command took, across reconnects."""
+
+    def setUp(self):
+        self.other = connection.get_new_connection(connection.get_connection_params())
+        self.other.autocommit = True
+        self.addCleanup(self.other.close)
+
+        # The provider has nothing new
+        transport = httpx.MockTransport(lambda request: httpx.Response(304))
+        self.client = httpx.Client(transport=transport)
+        self.addCleanup(self.client.close)
+
+    def make_daemon(self) -> SyncDaemon:
+        return SyncDaemon(
+            "http://provider.test/events/",
+            client=self.client,
+            lock_id=SYNC_RUN_LOCK_ID,
+        )
+
+    def other_lock(self) -> bool:
+        with self.other.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_try_advisory_lock(%s, %s)",
+                [SYNC_LOCK_NAMESPACE, SYNC_RUN_LOCK_ID],
+            )
+            return cursor.fetchone()[0]
+
+    def other_unlock(self) -> None:
+        with self.other.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_unlock(%s, %s)",
+                [SYNC_LOCK_NAMESPACE, SYNC_RUN_LOCK_ID],
+            )
+
+    def kill_connection(self) -> None:
+        """Terminate the daemon's session, as a database restart would."""
+        pid = connection.connection.get_backend_pid()
+        with self.other.cursor() as cursor:
+            cursor.execute("SELECT pg_terminate_backend(%s, 5000)", [pid])
+
+    def test_lock_held_across_polls(self):
+        with advisory_lock(SYNC_RUN_LOCK_ID) as acquired:
+            self.assertTrue(acquired)
+            daemon = self.make_daemon()
+            for _ in range(5):
+                self.assertFalse(daemon.poll())
+                self.assertFalse(self.other_lock())
+
+    def test_lock_taken_again_after_reconnect(self):
+        with advisory_lock(SYNC_RUN_LOCK_ID):
+            daemon = self.make_daemon()
+            self.kill_connection()
+            self.assertFalse(daemon.poll())
+            self.assertFalse(self.other_lock())
+            self.assertFalse(daemon.poll())
+
+    def test_lock_lost_to_another_run(self):
+        with advisory_lock(SYNC_RUN_LOCK_ID):
+            daemon = self.make_daemon()
+            self.kill_connection()
+            self.assertTrue(self.other_lock())
+            self.addCleanup(self.other_unlock)
+            with self.assertRaises(SyncAlreadyRunningError):
+                daemon.poll()
+
+
+@override_settings(
+    SYNC_HISTORY_START=date(2020, 1, 1), EVENT_PROVIDER_CHANGED_BEFORE_PARAM="before"
+)
+class SplitWindowsTests(SimpleTestCase):
+    def test_windows_from_since(self):
+        since = datetime(2030, 1, 1, tzinfo=UTC)
+        until = since + timedelta(days=10)
+        self.assertEqual(split_windows(since, until, timedelta(days=4)), [
+            (since, since + timedelta(days=4)),
+            (since + timedelta(days=4), since + timedelta(days=8)),
+            (since + timedelta(days=8), until),
+        ])
+
+    def test_empty_range_gets_one_window(self):
+        since = datetime(2030, 1, 1, tzinfo=UTC)
+        self.assertEqual(
+            split_windows(since, since, timedelta(days=7)), [(since, since)]
+        )
+
+    def test_full_sync_first_window_is_open(self):
+        until = datetime(2020, 1, 20, tzinfo=UTC)
+        self.assertIsNone(get_window_start(None, True, until))
+        self.assertEqual(split_windows(None, until, timedelta(days=7)), [
+            (None, datetime(2020, 1, 8, tzinfo=UTC)),
+            (datetime(2020, 1, 8, tzinfo=UTC), datetime(2020, 1, 15, tzinfo=UTC)),
+            (datetime(2020, 1, 15, tzinfo=UTC), until),
+        ])
+
+    def test_full_sync_before_history_start(self):
+        until = datetime(2019, 6, 1, tzinfo=UTC)
+        self.assertEqual(
+            split_windows(None, until, timedelta(days=7)), [(None, until)]
+        )
+
+    def test_window_url(self):
+        end = datetime(2030, 1, 8, tzinfo=UTC)
+        self.assertEqual(
+            window_url("http://provider.test/events/", None, end),
+            "http://provider.test/events/?before=2030-01-08T00%3A00%3A00%2B00%3A00",
+        )
+        self.assertEqual(
+            window_url("http://provider.test/events/", end - timedelta(days=7), end),
+            "http://provider.test/events/?changed_at=2030-01-01T00%3A00%3A00%2B00%3A00"
+            "&before=2030-01-08T00%3A00%3A00%2B00%3A00",
+        )
+
+
+class ReconcileTests(TestCase):
+    def setUp(self):
+        self.provider = FakeProvider(events=20, venues=3, page_size=6)
+        self.client = self.provider.client()
+        self.addCleanup(self.client.close)
+
+        venue = Venue.objects.create(name="Площадка")
+        event_time = timezone.now() + timedelta(days=30)
+        self.gone, self.local = (
+            Event.objects.create(
+                provider_id=provider_id,
+                name="Концерт",
+                event_time=event_time,
+                registration_deadline=event_time - timedelta(days=1),
+                venue=venue,
+                payload_hash="0" * 32,
+            )
+            for provider_id in (uuid4(), None)
+        )
+        EventRegistration.objects.create(
+            event=self.gone, full_name="Иван", email="ivan@example.com"
+        )
+
+    def sync(self, reconcile: Reconcile) -> SyncLog:
+        return sync_events(sync_all=True, client=self.client, reconcile=reconcile)
+
+    def test_close_missing_events(self):
+        sync_log = self.sync(Reconcile.CLOSE)
+        self.assertEqual(sync_log.reconciled_count, 1)
+        self.assertEqual(Event.objects.filter(provider_id__isnull=False).count(), 21)
+
+        self.gone.refresh_from_db()
+        self.assertEqual(self.gone.status, Event.Status.CLOSED)
+        self.assertEqual(self.gone.payload_hash, "")
+        self.local.refresh_from_db()
+        self.assertEqual(self.local.status, Event.Status.OPEN)
+
+        # Already closed events aren't counted again
+        self.assertEqual(self.sync(Reconcile.CLOSE).reconciled_count, 0)
+
+    def test_delete_missing_events(self):
+        sync_log = self.sync(Reconcile.DELETE)
+        self.assertEqual(sync_log.reconciled_count, 1)
+        self.assertFalse(Event.objects.filter(pk=self.gone.pk).exists())
+        self.assertFalse(EventRegistration.objects.exists())
+        self.assertTrue(Event.objects.filter(pk=self.local.pk).exists())
+        self.assertEqual(Event.objects.count(), 21)
+
+    def test_incomplete_or_empty_run_is_skipped(self):
+        sync_log = SyncLog.objects.create(start_url=self.provider.base_url)
+        with SeenEvents() as seen:
+            self.assertEqual(reconcile_events(sync_log, seen, Reconcile.DELETE), 0)
+
+            seen.add([ProviderEvent.from_payload(make_payload())], invalid=1)
+            self.assertEqual(reconcile_events(sync_log, seen, Reconcile.DELETE), 0)
+        self.assertTrue(Event.objects.filter(pk=self.gone.pk).exists())
+
+    def test_only_full_syncs(self):
+        with self.assertRaises(CannotReconcileError):
+            sync_events(client=self.client, reconcile=Reconcile.CLOSE)
+
+
+class ResumeTests(TestCase):
+    def setUp(self):
+        self.provider = FakeProvider(events=20, venues=3, page_size=6)
+        self.cursors = []
+        self.down_at = "12"
+        self.client = httpx.Client(transport=httpx.MockTransport(self.handle))
+        self.addCleanup(self.client.close)
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        cursor = request.url.params.get("cursor", "0")
+        self.cursors.append(cursor)
+        if cursor == self.down_at:
+            # Not an HTTP error, so it isn't retried
+            raise RuntimeError("Provider down")
+        return self.provider.handle(request)
+
+    def sync(self, **kwargs) -> SyncLog:
+        return sync_events(self.provider.base_url, client=self.client, **kwargs)
+
+    def test_resumes_from_last_page(self):
+        with self.assertRaises(RuntimeError):
+            self.sync(sync_all=True)
+        sync_log = SyncLog.objects.get()
+        self.assertEqual(sync_log.status, SyncLog.Status.FAILED)
+        self.assertIn("cursor=12", sync_log.cursor_url)
+        self.assertEqual(sync_log.pages_count, 2)
+        self.assertEqual(Event.objects.count(), 12)
+
+        self.down_at = None
+        self.cursors.clear()
+        resumed = self.sync(resume=True)
+        self.assertEqual(resumed.pk, sync_log.pk)
+        self.assertEqual(resumed.status, SyncLog.Status.SUCCEEDED)
+        self.assertEqual(self.cursors, ["12", "18"])
+        self.assertEqual(resumed.pages_count, 4)
+        self.assertEqual(resumed.created_count, 20)
+        self.assertEqual(Event.objects.count(), 20)
+
+        with self.assertRaises(NothingToResumeError):
+            self.sync(resume=True)
+
+
+@override_settings(SYNC_HISTORY_START=date(2020, 1, 1))
+class ShardedSyncTests(TestCase):
+    def setUp(self):
+        self.provider = FakeProvider(events=20, venues=3, page_size=6)
+        self.client = self.provider.client()
+        self.addCleanup(self.client.close)
+        patcher = mock.patch("sync.sharding.get_api_client", return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.sync_log = create_sharded_sync(
+            self.provider.base_url, sync_all=True, window=timedelta(days=365)
+        )
+
+    def test_shards_cover_whole_history(self):
+        shards = list(self.sync_log.shards.all())
+        self.assertGreater(len(shards), 1)
+        self.assertIsNone(shards[0].changed_from)
+        self.assertNotIn("changed_at=", shards[0].cursor_url)
+        for shard, following in pairwise(shards):
+            self.assertEqual(shard.changed_before, following.changed_from)
+            self.assertEqual(shard.status, SyncShard.Status.PENDING)
+
+    def test_claim_skips_shards_locked_elsewhere(self):
+        first, second = self.sync_log.shards.all()[:2]
+        other = connection.get_new_connection(connection.get_connection_params())
+        self.addCleanup(other.close)
+        with other.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_try_advisory_lock(%s, %s)",
+                [SYNC_LOCK_NAMESPACE, first.pk],
+            )
+
+        shard = claim_shard(self.sync_log.pk, "host:1")
+        self.addCleanup(advisory_unlock, shard.pk)
+        self.assertEqual(shard.pk, second.pk)
+        self.assertEqual(shard.status, SyncShard.Status.RUNNING)
+        self.assertEqual(shard.worker, "host:1")
+
+    def test_workers_sync_and_merge(self):
+        shards = self.sync_log.shards.count()
+        self.assertEqual(run_shard_worker(self.sync_log.pk), shards)
+        self.assertFalse(
+            self.sync_log.shards.exclude(status=SyncShard.Status.SUCCEEDED).exists()
+        )
+
+        sync_log = merge_shards(self.sync_log)
+        self.assertEqual(sync_log.status, SyncLog.Status.SUCCEEDED)
+        self.assertEqual(sync_log.created_count, 20)
+        self.assertEqual(Event.objects.count(), 20)
+        # The watermark of the run is the latest change of any shard
+        self.assertEqual(
+            sync_log.high_watermark.isoformat(),
+            max(event["changed_at"] for event in self.provider._events),
+        )
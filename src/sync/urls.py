@@ -0,0 +1,8 @@
+from rest_framework.routers import DefaultRouter
+
+from .views import SyncLogViewSet
+
+router = DefaultRouter()
+router.register(r"runs", SyncLogViewSet, basename="sync-runs")
+
+urlpatterns = router.urls
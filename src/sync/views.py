@@ -1,3 +1,64 @@
-from django.shortcuts import render
+from datetime import timedelta
 
-# Create your views here.
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from .models import SyncLog
+from .pagination import SyncLogPagination
+from .serializers import SyncLogSerializer, SyncTrendSerializer
+from .stats import SyncStats
+
+
+class SyncLogViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Provides `list` and `retrieve` for sync runs, and per-day `trends`
+    """
+    queryset = SyncLog.objects.all()
+    serializer_class = SyncLogSerializer
+    permission_classes = [IsAdminUser]
+    pagination_class = SyncLogPagination
+    filterset_fields = ["status"]
+
+    @action(detail=False, serializer_class=SyncTrendSerializer)
+    def trends(self, request):
+        """Finished runs of the last `days` (30 by default), summed per day."""
+        try:
+            days = int(request.query_params.get("days", 30))
+        except ValueError:
+            days = 30
+
+        totals = (
+            SyncLog.objects
+            .filter(
+                started_at__gte=timezone.now() - timedelta(days=days),
+                finished_at__isnull=False,
+            )
+            .annotate(day=TruncDate("started_at"))
+            .values("day")
+            .annotate(
+                runs=Count("pk"),
+                failed_runs=Count("pk", filter=Q(status=SyncLog.Status.FAILED)),
+                failed_count=Sum("failed_count"),
+                wall_time=Sum(F("finished_at") - F("started_at")),
+                **{field: Sum(field) for field in SyncStats.field_names()},
+            )
+            .order_by("day")
+        )
+
+        trends = []
+        for day in totals:
+            wall_time = day.pop("wall_time")
+            day["events_per_second"] = (
+                day["events_count"] / wall_time.total_seconds()
+                if wall_time
+                else None
+            )
+            trends.append(day)
+
+        serializer = self.get_serializer(trends, many=True)
+        return Response(serializer.data)
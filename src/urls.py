@@ -31,6 +31,7 @@ def api_root(request, format=None):
         "logout": reverse("token_blacklist", request=request, format=format),
         "token_refresh": reverse("token_refresh", request=request, format=format),
         "events": reverse("events-list", request=request, format=format),
+        "sync_runs": reverse("sync-runs-list", request=request, format=format),
     })
 
 
@@ -41,6 +42,7 @@ urlpatterns = [
     path(f"{api_v1_str}/", api_root, name="api-root"),
     path(f"{api_v1_str}/auth/", include("auth_jwt.urls"), name="auth_jwt"),
     path(f"{api_v1_str}/events/", include("events.urls")),
+    path(f"{api_v1_str}/sync/", include("sync.urls")),
 ]
 
 if settings.DEBUG: